@@ -1,7 +1,12 @@
 from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn, CreateIndex
 from .database import engine, SessionLocal
 from typing import Annotated
+import logging
+import os
 from models.userModels import  Base as UserBase
 from models.Categories import  Base as CategoriesBase
 from models.Products import  Base as ProductsBase
@@ -18,6 +23,109 @@ BillingCard.metadata.create_all(bind=engine) # for Billing models
 VlogBase.metadata.create_all(bind=engine) # for Billing models 
 HeloBase.metadata.create_all(bind=engine) # for Billing models 
 
+logger = logging.getLogger(__name__)
+
+# Run upgrade_schema from the app's startup hook; deployments with several
+# workers can turn this off and run it once as a deploy step instead
+# (python -m db.connection)
+UPGRADE_SCHEMA_ON_STARTUP = os.getenv("UPGRADE_SCHEMA_ON_STARTUP", "1") == "1"
+PRIMARY_IMAGE_BACKFILL_BATCH_SIZE = 1000
+
+
+def _has_column(connection, table_name, column_name):
+    return connection.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table_name "
+        "AND column_name = :column_name"
+    ), {"table_name": table_name, "column_name": column_name}).first() is not None
+
+
+def add_missing_columns():
+    """
+    create_all doesn't add columns to existing tables either; add the ones
+    models gained later. Each ALTER only runs when the column is missing, as
+    it takes an ACCESS EXCLUSIVE lock (and adding the generated title_tsv
+    rewrites the table).
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        if not _has_column(connection, "products", "title_tsv"):
+            title_tsv = ProductsBase.metadata.tables["products"].c.title_tsv
+            connection.execute(text(
+                f"ALTER TABLE products ADD COLUMN {CreateColumn(title_tsv).compile(dialect=engine.dialect)}"
+            ))
+        if not _has_column(connection, "products", "primary_image_index"):
+            connection.execute(text("ALTER TABLE products ADD COLUMN primary_image_index INTEGER"))
+
+
+def backfill_primary_image_index(batch_size=PRIMARY_IMAGE_BACKFILL_BATCH_SIZE):
+    """
+    products.primary_image_index replaced the per-image is_primary flags as
+    the source of truth; rows that don't have it yet take the index of their
+    flagged image (rows with none stay NULL and keep using their stored
+    flags). Runs in id-ordered batches, each committed on its own, so no
+    long transaction holds row locks across the table.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    last_id = 0
+    while last_id is not None:
+        with engine.begin() as connection:
+            last_id = connection.execute(text("""
+                WITH batch AS (
+                    SELECT id, images FROM products
+                    WHERE primary_image_index IS NULL AND id > :last_id
+                    ORDER BY id LIMIT :batch_size
+                ), flagged AS (
+                    SELECT b.id, min(e.ordinality) - 1 AS position
+                    FROM batch b
+                    CROSS JOIN LATERAL jsonb_array_elements(
+                        CASE WHEN jsonb_typeof(b.images) = 'array' THEN b.images ELSE '[]'::jsonb END
+                    ) WITH ORDINALITY AS e(image, ordinality)
+                    WHERE e.image->>'is_primary' = 'true'
+                    GROUP BY b.id
+                ), updated AS (
+                    UPDATE products SET primary_image_index = flagged.position
+                    FROM flagged WHERE products.id = flagged.id
+                )
+                SELECT max(id) FROM batch
+            """), {"last_id": last_id, "batch_size": batch_size}).scalar()
+
+
+def upgrade_schema():
+    """Add the columns the models read to an existing database and backfill them"""
+    add_missing_columns()
+    backfill_primary_image_index()
+
+
+def create_missing_indexes():
+    """
+    create_all skips tables that already exist, so indexes added to the models
+    later never reach an existing database; create any that are missing.
+    On Postgres each index is built CONCURRENTLY (outside a transaction) so
+    writes to the table aren't blocked while it builds, and IF NOT EXISTS
+    makes it safe to run from several workers or repeatedly.
+    """
+    if engine.dialect.name != "postgresql":
+        for table in UserBase.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in UserBase.metadata.sorted_tables:
+            for index in table.indexes:
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+                ddl = ddl.replace(" INDEX IF NOT EXISTS ", " INDEX CONCURRENTLY IF NOT EXISTS ", 1)
+                try:
+                    connection.execute(text(ddl))
+                except DBAPIError as e:
+                    # Leaves the index missing (or INVALID, for a failed
+                    # concurrent build); queries still work, only slower
+                    logger.warning(f"Could not create index {index.name}: {e}")
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -26,4 +134,9 @@ def get_db():
         db.close()
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+db_dependency = Annotated[Session, Depends(get_db)]
+
+
+if __name__ == "__main__":
+    upgrade_schema()
+    create_missing_indexes()
@@ -9,7 +9,16 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# One pooled engine per process; every request session borrows from this pool.
+# Sized for concurrent dashboard reports; when running behind PgBouncer
+# (transaction mode) point DATABASE_URL at the bouncer instead of Postgres.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+    pool_pre_ping=True,   # drop dead connections before handing them out
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
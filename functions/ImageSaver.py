@@ -5,6 +5,7 @@ import re
 IMAGE_FOLDER = "./static/product_images"
 BASE_URL = "/static/product_images/"
 os.makedirs(IMAGE_FOLDER, exist_ok=True)
+NON_BASE64_CHARS = re.compile(r"[^A-Za-z0-9+/=]")
 
 # ---------------- HELPERS ----------------
 def decode_base64(data: str):
@@ -12,7 +13,7 @@ def decode_base64(data: str):
         return None
     if "," in data:
         data = data.split(",", 1)[1]
-    data = re.sub(r"[^A-Za-z0-9+/=]", "", data)
+    data = NON_BASE64_CHARS.sub("", data)
     missing_padding = len(data) % 4
     if missing_padding:
         data += "=" * (4 - missing_padding)
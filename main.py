@@ -3,7 +3,8 @@ from fastapi import FastAPI, Depends,Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 from Endpoints.Auth import verification, resetPassword ,refreshToken
-from routes import auth, category,products,search,cart,wishlist,billing,dashboard,vlog, report,hero_slider
+from routes import auth, category,products,search,cart,wishlist,billing,vlog, report,hero_slider
+from db.connection import UPGRADE_SCHEMA_ON_STARTUP, create_missing_indexes, upgrade_schema
 from Endpoints.two_factor import otp
 from fastapi.responses import HTMLResponse
 # from db.database import Base,engine
@@ -74,7 +75,6 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(hero_slider.router)
 app.include_router(report.router)
 app.include_router(vlog.router)
-app.include_router(dashboard.router)
 app.include_router(billing.router)
 app.include_router(wishlist.router)
 app.include_router(cart.router)
@@ -86,6 +86,19 @@ app.include_router(resetPassword.router)
 app.include_router(verification.router)
 app.include_router(auth.router)
 app.include_router(otp.router)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    if UPGRADE_SCHEMA_ON_STARTUP:
+        # Queries select the newer columns, so they exist before requests are served
+        await asyncio.to_thread(upgrade_schema)
+        # Model indexes missing from an existing database and the /search trigram
+        # indexes; built concurrently in the background so startup doesn't wait
+        asyncio.create_task(asyncio.to_thread(create_missing_indexes))
+        asyncio.create_task(asyncio.to_thread(search.create_search_indexes))
+    # Keeps the /dashboard materialized views fresh
+    asyncio.create_task(report.refresh_report_views_periodically())
+
 @app.get("/secure-data")
 def secure_data(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
     token = credentials.credentials
@@ -33,7 +33,7 @@ class SubCategory(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    main_category_id = Column(Integer, ForeignKey("main_categories.id", ondelete="CASCADE"), nullable=False)
+    main_category_id = Column(Integer, ForeignKey("main_categories.id", ondelete="CASCADE"), nullable=False, index=True)
     main_category = relationship("MainCategory", back_populates="sub_categories")
 
     product_categories = relationship("ProductCategory", back_populates="sub_category", cascade="all, delete-orphan")
@@ -54,7 +54,7 @@ class ProductCategory(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    sub_category_id = Column(Integer, ForeignKey("sub_categories.id", ondelete="CASCADE"), nullable=False)
+    sub_category_id = Column(Integer, ForeignKey("sub_categories.id", ondelete="CASCADE"), nullable=False, index=True)
     sub_category = relationship("SubCategory", back_populates="product_categories")
 
     __table_args__ = (
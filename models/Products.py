@@ -1,18 +1,43 @@
 from sqlalchemy import (
     Column, Integer, String, Text, ForeignKey, Float,
-    Boolean, DateTime
+    Boolean, DateTime, Computed, Index, text
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from db.database import Base
 from datetime import datetime
 
 
+# Text search configuration of Product.title_tsv; 'simple' only lowercases,
+# so tokens line up with the lowercase ILIKE matching in /search
+TITLE_TSVECTOR_CONFIG = "simple"
+
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_title_tsv", "title_tsv", postgresql_using="gin"),
+        # Containment (tags @> '["term"]') lookups for the broad tier of /search
+        Index(
+            "ix_products_tags_active", "tags", postgresql_using="gin",
+            postgresql_ops={"tags": "jsonb_path_ops"}, postgresql_where=text("is_active")
+        ),
+        Index(
+            "ix_products_features_active", "features", postgresql_using="gin",
+            postgresql_ops={"features": "jsonb_path_ops"}, postgresql_where=text("is_active")
+        ),
+        # Newest-first pages of active products (product list, search samples)
+        # walk this backwards and stop at the LIMIT instead of sorting
+        Index("ix_products_active_created_at", "created_at", "id", postgresql_where=text("is_active")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
+    # Pre-tokenized title for full-text ranking in /search; generated by the
+    # database and deferred so regular product loads don't fetch it
+    title_tsv = deferred(Column(
+        TSVECTOR, Computed(f"to_tsvector('{TITLE_TSVECTOR_CONFIG}', title)", persisted=True)
+    ))
     description = Column(Text, nullable=False)
 
     price = Column(Float, nullable=False)
@@ -52,14 +77,30 @@ class Product(Base):
     #   {"url": "image1.png", "is_primary": True},
     #   {"url": "image2.png", "is_primary": False}
     # ]
+    # Index of the primary image in `images`; the per-image is_primary flags are
+    # derived from it at read time so set-primary is a single scalar update
+    primary_image_index = Column(Integer, nullable=True, default=0)
 
     # Relationships
-    category_id = Column(Integer, ForeignKey("product_categories.id", ondelete="SET NULL"), nullable=True)
+    category_id = Column(Integer, ForeignKey("product_categories.id", ondelete="SET NULL"), nullable=True, index=True)
     category = relationship("ProductCategory")
 
     # Owner (uncomment when User model is ready)
     owner_id = Column(Integer, nullable=True)
     # owner = relationship("User", back_populates="products")
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def resolved_images(self):
+        """Images with is_primary computed from primary_image_index (stored flags are used for legacy rows)"""
+        images = self.images or []
+        primary_index = self.primary_image_index
+        if primary_index is None:
+            return images
+        # Stored flags usually agree already (they only go stale after
+        # set-primary), so images are copied only when the flag differs
+        return [
+            img if img.get("is_primary") is (i == primary_index) else {**img, "is_primary": i == primary_index}
+            for i, img in enumerate(images)
+        ]
@@ -18,7 +18,7 @@ class Billing(Base):
     __tablename__ = "billings"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Common fields
     full_name = Column(String(255), nullable=False)
@@ -35,7 +35,7 @@ class Billing(Base):
     zip_code = Column(String(255), nullable=True)
     country = Column(String(255), nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
     # user = relationship("Users", back_populates="billings")
@@ -43,7 +43,7 @@ class Users(Base):
     two_factor = Column(Boolean, default=True)  # email/phone verification
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     # billings = relationship("Billing", back_populates="users", cascade="all, delete")
 
@@ -9,6 +9,7 @@ from schemas.auth.RegisterResponse import AuthProvider_validator
 import os
 
 from models.userModels import Users, UserRole
+from sqlalchemy import func
 from schemas.auth.schemas import CreateUserRequest
 
 from datetime import datetime
@@ -128,7 +129,7 @@ async def google_auth_token_route(
 
 
 @router.get("/users")
-async def get_all_users(
+def get_all_users(
     db: db_dependency,
     current_user: user_dependency,
     skip: int = 0,
@@ -145,11 +146,17 @@ async def get_all_users(
         )
     
     try:
-        # Get total count of users
-        total_users = db.query(Users).count()
+        # Get paginated users, with the total count as a window column
+        rows = db.query(Users, func.count().over().label("total_users")).offset(skip).limit(limit).all()
+        users = [row[0] for row in rows]
         
-        # Get paginated users
-        users = db.query(Users).offset(skip).limit(limit).all()
+        if rows:
+            total_users = rows[0].total_users
+        elif skip:
+            # Offset past the last user: the page is empty but the total is not
+            total_users = db.query(Users).count()
+        else:
+            total_users = 0
         
         # Convert users to list of dictionaries
         users_list = []
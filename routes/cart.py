@@ -104,7 +104,7 @@ async def view_cart(db: db_dependency, user: user_dependency):
             "product_id": product.id,
             "product_name": product.title,
             "delivery_fee":product.delivery_fee,
-            "product_image": product.images,
+            "product_image": product.resolved_images(),
             "current_price": product.price,
             "price_at_time": cart_item.price_at_time,
             "quantity": cart_item.quantity,
@@ -1,8 +1,9 @@
 # routes/product.py
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends,Query
-from sqlalchemy import and_, or_
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import selectinload, joinedload 
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends,Query, Request, BackgroundTasks
+from sqlalchemy import and_, or_, update, func, cast, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy.orm import selectinload, joinedload, load_only
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import os
@@ -11,10 +12,14 @@ import re
 import uuid
 import logging
 import json
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from functions.productsMana import encode_id
+from routes.search import invalidate_search_cache
 # Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Try to import image processing libraries
@@ -55,6 +60,10 @@ MAX_HEIGHT = 1200   # Maximum height for images
 THUMBNAIL_SIZE = (400, 400)  # Thumbnail dimensions
 MAINURL=os.getenv("FRONTEND_URL_MAIN", "http://127.0.0.1:8000")
 FRONTEND_URL_ONLINE = os.getenv("FRONTEND_URL_ONLINE", "https://umukamezi.nexventures.net")
+
+# Shared pool for image decode/compress/write so upload handlers only wait on the
+# futures they need instead of blocking the event loop on disk I/O per image.
+IMAGE_POOL = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2, thread_name_prefix="product-images")
 # ---------------- HELPERS ----------------
 def get_image_extension_from_content_type(content_type: str) -> str:
     """Get image extension from content type"""
@@ -159,8 +168,49 @@ def optimize_image(image_data: bytes, image_type: str = "main") -> bytes:
     
     return compressed_data
 
+def save_hover_image_streaming(product_id: int, file: UploadFile) -> Dict[str, str]:
+    """Decode the hover image straight from the upload's file object and write the resized output once"""
+    # Always re-encoded as JPEG below, whatever the upload's content type
+    unique_id = uuid.uuid4().hex[:8]
+    filename = f"product_{product_id}_hover_{unique_id}.jpg"
+    filepath = os.path.join(PRODUCT_IMAGE_FOLDER, filename)
+    tmp_filepath = f"{filepath}.tmp"
+    
+    file.file.seek(0)
+    try:
+        with Image.open(file.file) as img:
+            # Let JPEG decoders downscale while decoding instead of materializing full size
+            img.draft('RGB', (MAX_WIDTH, MAX_HEIGHT))
+            # JPEG only takes RGB/L; convert everything else (RGBA, P, I;16, CMYK, ...)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
+            
+            with open(tmp_filepath, "wb") as f:
+                img.save(f, format='JPEG', optimize=True, quality=IMAGE_QUALITY, progressive=True)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_filepath, filepath)
+    except Exception:
+        # Don't leave a partial .tmp behind when decoding or writing fails
+        try:
+            os.unlink(tmp_filepath)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    logger.info(f"Hover image saved: {filename}")
+    
+    return {
+        "main": f"{PRODUCT_BASE_URL}{filename}",
+        "thumbnail": None
+    }
+
 def save_product_image_from_file(product_id: int, file: UploadFile, image_type: str = "main") -> Dict[str, str]:
     """Save product image from uploaded file with multiple versions"""
+    if image_type == "hover" and PIL_AVAILABLE:
+        return save_hover_image_streaming(product_id, file)
+    
     try:
         # Read file content
         file_content = file.file.read()
@@ -202,52 +252,81 @@ def save_product_image_from_file(product_id: int, file: UploadFile, image_type:
         logger.error(f"Error saving image from file: {str(e)}")
         raise
 
-def delete_single_image_file(image_url: str):
-    """Delete a single image file and its thumbnail if they exist"""
+async def save_product_images_concurrently(product_id: int, files: List[UploadFile], image_type: str = "main") -> List[Any]:
+    """Save several uploaded images on IMAGE_POOL; returns saved urls or the exception per file, in order"""
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(IMAGE_POOL, save_product_image_from_file, product_id, image_file, image_type)
+        for image_file in files
+    ]
+    return await asyncio.gather(*futures, return_exceptions=True)
+
+def _invalidate_search_caches():
+    """Drop cached search responses after any product write (they embed images too)"""
+    invalidate_search_cache()
+
+def _is_postgres(db) -> bool:
+    """Whether the session is bound to PostgreSQL (JSONB operators available)"""
+    return db.get_bind().dialect.name == "postgresql"
+
+def _image_url_to_path(image_url: Optional[str]) -> Optional[str]:
+    """Map a stored product image URL to its file on disk, or None if it is not ours"""
     if image_url and image_url.startswith(PRODUCT_BASE_URL):
-        filename = image_url.replace(PRODUCT_BASE_URL, '')
-        filepath = os.path.join(PRODUCT_IMAGE_FOLDER, filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            logger.info(f"Deleted image file: {filename}")
-        
-        # Also try to delete thumbnail if it exists
-        thumb_filename = filename.replace('.', '_thumb.')
-        thumb_filepath = os.path.join(PRODUCT_IMAGE_FOLDER, thumb_filename)
-        if os.path.exists(thumb_filepath):
-            os.remove(thumb_filepath)
-            logger.info(f"Deleted thumbnail file: {thumb_filename}")
+        return os.path.join(PRODUCT_IMAGE_FOLDER, image_url.replace(PRODUCT_BASE_URL, ''))
+    return None
 
-def delete_old_hover_image_files(product: Product):
+def _safe_unlink(filepath: str) -> bool:
+    """Remove a file, ignoring ones that are already gone"""
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        return False
+    logger.info(f"Deleted image file: {os.path.basename(filepath)}")
+    return True
+
+async def bulk_unlink(paths: List[str]) -> int:
+    """Unlink many files at once on IMAGE_POOL so the syscalls overlap; returns how many were removed"""
+    paths = [p for p in paths if p]
+    if not paths:
+        return 0
+    loop = asyncio.get_running_loop()
+    removed = await asyncio.gather(*(
+        loop.run_in_executor(IMAGE_POOL, _safe_unlink, path) for path in paths
+    ))
+    return sum(removed)
+
+def single_image_file_paths(image_url: str) -> List[str]:
+    """Paths of an image file and its thumbnail"""
+    filepath = _image_url_to_path(image_url)
+    if not filepath:
+        return []
+    filename = os.path.basename(filepath)
+    return [filepath, os.path.join(PRODUCT_IMAGE_FOLDER, filename.replace('.', '_thumb.'))]
+
+def hover_image_file_paths(product: Product) -> List[str]:
+    """Paths of the hover image file"""
+    filepath = _image_url_to_path(product.hover_image)
+    return [filepath] if filepath else []
+
+def main_image_file_paths(product: Product) -> List[str]:
+    """Paths of main product image files and thumbnails (not hover image)"""
+    paths = []
+    for image_data in product.images or []:
+        paths.append(_image_url_to_path(image_data.get('url')))
+        paths.append(_image_url_to_path(image_data.get('thumbnail')))
+    return [p for p in paths if p]
+
+async def delete_single_image_file(image_url: str):
+    """Delete a single image file and its thumbnail if they exist"""
+    await bulk_unlink(single_image_file_paths(image_url))
+
+async def delete_old_hover_image_files(product: Product):
     """Delete only hover image files"""
-    # Delete hover image
-    if product.hover_image and product.hover_image.startswith(PRODUCT_BASE_URL):
-        filename = product.hover_image.replace(PRODUCT_BASE_URL, '')
-        filepath = os.path.join(PRODUCT_IMAGE_FOLDER, filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            logger.info(f"Deleted old hover image: {filename}")
+    await bulk_unlink(hover_image_file_paths(product))
 
-def delete_old_main_image_files(product: Product):
+async def delete_old_main_image_files(product: Product):
     """Delete only main product image files (not hover image)"""
-    # Delete main product images and thumbnails
-    if product.images:
-        for image_data in product.images:
-            # Delete main image
-            if 'url' in image_data and image_data['url'].startswith(PRODUCT_BASE_URL):
-                filename = image_data['url'].replace(PRODUCT_BASE_URL, '')
-                filepath = os.path.join(PRODUCT_IMAGE_FOLDER, filename)
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-                    logger.info(f"Deleted old image: {filename}")
-            
-            # Delete thumbnail if exists
-            if 'thumbnail' in image_data and image_data['thumbnail'] and image_data['thumbnail'].startswith(PRODUCT_BASE_URL):
-                thumb_filename = image_data['thumbnail'].replace(PRODUCT_BASE_URL, '')
-                thumb_filepath = os.path.join(PRODUCT_IMAGE_FOLDER, thumb_filename)
-                if os.path.exists(thumb_filepath):
-                    os.remove(thumb_filepath)
-                    logger.info(f"Deleted old thumbnail: {thumb_filename}")
+    await bulk_unlink(main_image_file_paths(product))
 
 # Custom form field parser for optional integers
 def parse_optional_int(value: Optional[str]) -> Optional[int]:
@@ -276,7 +355,7 @@ def parse_optional_bool(value: Optional[str]) -> Optional[bool]:
 
 
 @router.get("/", response_model=ProductListResponse)
-async def get_products(
+def get_products(
     db: db_dependency,
     # Basic filters
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -348,8 +427,9 @@ async def get_products(
         # Import category models
         from models.Categories import MainCategory, SubCategory, ProductCategory
         
-        # Start with base query
-        query = db.query(Product)
+        # Start with base query; categories for the page are loaded in one
+        # extra IN query rather than lazily per product when serializing
+        query = db.query(Product).options(selectinload(Product.category))
         
         # Build filters dynamically
         filters = []
@@ -496,13 +576,6 @@ async def get_products(
         if filters:
             query = query.filter(and_(*filters))
         
-        # Get total count before pagination - FIXED: Use distinct count when joins are involved
-        if category_filters_applied:
-            # When category joins are applied, we need to count distinct products to avoid duplicates
-            total_count = query.distinct().count()
-        else:
-            total_count = query.count()
-        
         # Apply sorting - FIXED: Use distinct when joins are involved
         valid_sort_columns = [
             'id', 'title', 'price', 'original_price', 'discount', 'rating', 
@@ -519,11 +592,22 @@ async def get_products(
         else:
             query = query.order_by(sort_column.asc())
         
-        # Apply pagination - FIXED: Use distinct when joins are involved
+        # Category joins only walk many-to-one relationships, so each product
+        # appears once and the window total matches the distinct count.
+        # Pagination and total count share one statement via COUNT(*) OVER ().
+        page_query = query.add_columns(func.count().over().label("total_count"))
         if category_filters_applied:
-            products = query.distinct().offset(skip).limit(limit).all()
+            page_query = page_query.distinct()
+        rows = page_query.offset(skip).limit(limit).all()
+        products = [row[0] for row in rows]
+        
+        if rows:
+            total_count = rows[0].total_count
+        elif skip:
+            # Offset past the last match: the page is empty but the total is not
+            total_count = query.order_by(None).count()
         else:
-            products = query.offset(skip).limit(limit).all()
+            total_count = 0
         
         logger.info(f"Products query completed: {len(products)} products found out of {total_count} total")
         logger.info(f"Category filters applied: {category_filters_applied}")
@@ -640,25 +724,28 @@ async def create_product(
             logger.info("Processing main images...")
             processed_images = []
             
-            for i, image_file in enumerate(images):
-                try:
-                    saved_urls = save_product_image_from_file(db_product.id, image_file, "main")
-                    image_info = {
-                        "url": saved_urls["main"],
-                        "is_primary": i == 0,  # First image is primary by default
-                        "alt_text": f"Product image {i+1}"
-                    }
-                    
-                    # Add thumbnail URL if available
-                    if saved_urls["thumbnail"]:
-                        image_info["thumbnail"] = saved_urls["thumbnail"]
-                        
-                    processed_images.append(image_info)
-                    logger.info(f"Successfully processed image {i}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing image {i}: {str(e)}")
+            # Main and hover images are written in parallel on the shared pool
+            main_task = save_product_images_concurrently(db_product.id, images, "main")
+            hover_task = asyncio.create_task(save_product_images_concurrently(db_product.id, [hover_image], "hover")) if hover_image else None
+            saved_results = await main_task
+            
+            for i, saved_urls in enumerate(saved_results):
+                if isinstance(saved_urls, Exception):
+                    logger.error(f"Error processing image {i}: {str(saved_urls)}")
                     continue
+                
+                image_info = {
+                    "url": saved_urls["main"],
+                    "is_primary": i == 0,  # First image is primary by default
+                    "alt_text": f"Product image {i+1}"
+                }
+                
+                # Add thumbnail URL if available
+                if saved_urls["thumbnail"]:
+                    image_info["thumbnail"] = saved_urls["thumbnail"]
+                    
+                processed_images.append(image_info)
+                logger.info(f"Successfully processed image {i}")
             
             if not processed_images:
                 logger.error("No valid images could be processed")
@@ -668,18 +755,19 @@ async def create_product(
             
             # Process hover image if provided
             processed_hover_image = None
-            if hover_image:
+            if hover_task:
                 logger.info("Processing hover image...")
-                try:
-                    saved_urls = save_product_image_from_file(db_product.id, hover_image, "hover")
+                saved_urls = (await hover_task)[0]
+                if isinstance(saved_urls, Exception):
+                    logger.error(f"Error processing hover image: {str(saved_urls)}")
+                    # Continue without hover image if processing fails
+                else:
                     processed_hover_image = saved_urls["main"]
                     logger.info("Hover image processed successfully")
-                except Exception as e:
-                    logger.error(f"Error processing hover image: {str(e)}")
-                    # Continue without hover image if processing fails
             
             # Update product with image URLs
             db_product.images = processed_images
+            db_product.primary_image_index = 0
             db_product.hover_image = processed_hover_image
             db.commit()
             db.refresh(db_product)
@@ -690,8 +778,10 @@ async def create_product(
             # Clean up if image processing fails
             db.delete(db_product)
             db.commit()
+            _invalidate_search_caches()
             raise HTTPException(status_code=500, detail=f"Failed to process images: {str(e)}")
         
+        _invalidate_search_caches()
         return db_product
         
     except HTTPException:
@@ -746,62 +836,60 @@ async def update_product(
         if not category:
             raise HTTPException(status_code=400, detail="Category does not exist")
     
-    # Store current state for comparison
-    current_images = db_product.images.copy() if db_product.images else []
-    current_hover_image = db_product.hover_image
+    # Image/JSON column values; unlike the simple fields these may legitimately be None or empty
+    column_updates = {}
     
     try:
         # Process main images if provided
         if images is not None:
             logger.info(f"Processing {len(images)} new images for update")
             
-            # Delete old images if not keeping them
+            # Delete old images if not keeping them; only copy the list when it is kept
             if not keep_existing_images:
-                delete_old_main_image_files(db_product)
-                processed_images = []
-            else:
-                processed_images = current_images.copy()
+                await delete_old_main_image_files(db_product)
+            processed_images = db_product.images.copy() if (db_product.images and keep_existing_images) else []
             
             # Process new images
-            for i, image_file in enumerate(images):
-                try:
-                    saved_urls = save_product_image_from_file(product_id, image_file, "main")
-                    image_info = {
-                        "url": saved_urls["main"],
-                        "is_primary": len(processed_images) == 0,  # First new image is primary if no existing images
-                        "alt_text": f"Product image {len(processed_images) + 1}"
-                    }
-                    
-                    # Add thumbnail URL if available
-                    if saved_urls["thumbnail"]:
-                        image_info["thumbnail"] = saved_urls["thumbnail"]
-                        
-                    processed_images.append(image_info)
-                    logger.info(f"Successfully processed new image {i}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing new image {i}: {str(e)}")
+            saved_results = await save_product_images_concurrently(product_id, images, "main")
+            for i, saved_urls in enumerate(saved_results):
+                if isinstance(saved_urls, Exception):
+                    logger.error(f"Error processing new image {i}: {str(saved_urls)}")
                     continue
+                
+                image_info = {
+                    "url": saved_urls["main"],
+                    "is_primary": len(processed_images) == 0,  # First new image is primary if no existing images
+                    "alt_text": f"Product image {len(processed_images) + 1}"
+                }
+                
+                # Add thumbnail URL if available
+                if saved_urls["thumbnail"]:
+                    image_info["thumbnail"] = saved_urls["thumbnail"]
+                    
+                processed_images.append(image_info)
+                logger.info(f"Successfully processed new image {i}")
             
             if not processed_images and images:
                 raise HTTPException(status_code=400, detail="No valid images could be processed")
             
-            db_product.images = processed_images
+            column_updates["images"] = processed_images
+            if not keep_existing_images:
+                column_updates["primary_image_index"] = 0
             logger.info(f"Updated main images: {len(processed_images)} images total")
         
         # Process hover image if provided
         if hover_image is not None:
-            # Delete old hover image
-            delete_old_hover_image_files(db_product)
-            
             try:
-                saved_urls = save_product_image_from_file(product_id, hover_image, "hover")
-                db_product.hover_image = saved_urls["main"]
-                logger.info("Hover image updated successfully")
+                loop = asyncio.get_running_loop()
+                saved_urls = await loop.run_in_executor(IMAGE_POOL, save_product_image_from_file, product_id, hover_image, "hover")
             except Exception as e:
                 logger.error(f"Error processing hover image: {str(e)}")
-                # Set to None if processing fails
-                db_product.hover_image = None
+                # Keep the current hover image (and its file) if processing fails
+            else:
+                column_updates["hover_image"] = saved_urls["main"]
+                logger.info("Hover image updated successfully")
+                # Delete old hover image once the new one is on disk
+                await delete_old_hover_image_files(db_product)
         
         # Update other fields with parsed values
         update_data = {}
@@ -842,23 +930,33 @@ async def update_product(
         
         # Parse and update JSON fields if provided
         if tags is not None:
-            db_product.tags = json.loads(tags) if tags else []
+            column_updates["tags"] = json.loads(tags) if tags else []
         if features is not None:
-            db_product.features = json.loads(features) if features else []
+            column_updates["features"] = json.loads(features) if features else []
         if colors is not None:
-            db_product.colors = json.loads(colors) if colors else []
+            column_updates["colors"] = json.loads(colors) if colors else []
         
         # Update simple fields
-        for key, value in update_data.items():
-            if value is not None:
-                setattr(db_product, key, value)
-        
+        values = {key: value for key, value in update_data.items() if value is not None}
+        values.update(column_updates)
+        
+        if values:
+            # UPDATE ... RETURNING gives back the new row in the same round-trip as the write
+            db_product = db.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(**values)
+                .returning(Product)
+            ).scalar_one()
+        
+        # Serialize before commit so the expired instance isn't re-SELECTed
+        response = ProductResponse.model_validate(db_product)
         db.commit()
-        db.refresh(db_product)
+        _invalidate_search_caches()
         
         logger.info(f"Product {product_id} updated successfully")
         
-        return db_product
+        return response
         
     except Exception as e:
         logger.error(f"Error updating product: {str(e)}")
@@ -883,40 +981,52 @@ async def add_product_images(
         raise HTTPException(status_code=400, detail="No images provided")
     
     try:
-        current_images = db_product.images.copy() if db_product.images else []
+        current_images = db_product.images or []
         new_images = []
         
-        for image_file in images:
-            try:
-                saved_urls = save_product_image_from_file(product_id, image_file, "main")
-                image_info = {
-                    "url": saved_urls["main"],
-                    "is_primary": False,  # New images are not primary by default
-                    "alt_text": f"Product image {len(current_images) + len(new_images) + 1}"
-                }
-                
-                # Add thumbnail URL if available
-                if saved_urls["thumbnail"]:
-                    image_info["thumbnail"] = saved_urls["thumbnail"]
-                    
-                new_images.append(image_info)
-                logger.info(f"Successfully added new image")
-                
-            except Exception as e:
-                logger.error(f"Error processing image: {str(e)}")
+        saved_results = await save_product_images_concurrently(product_id, images, "main")
+        for saved_urls in saved_results:
+            if isinstance(saved_urls, Exception):
+                logger.error(f"Error processing image: {str(saved_urls)}")
                 continue
+            
+            image_info = {
+                "url": saved_urls["main"],
+                "is_primary": False,  # New images are not primary by default
+                "alt_text": f"Product image {len(current_images) + len(new_images) + 1}"
+            }
+            
+            # Add thumbnail URL if available
+            if saved_urls["thumbnail"]:
+                image_info["thumbnail"] = saved_urls["thumbnail"]
+                
+            new_images.append(image_info)
+            logger.info(f"Successfully added new image")
         
         if not new_images:
             raise HTTPException(status_code=400, detail="No valid images could be processed")
         
         # Combine existing and new images
-        db_product.images = current_images + new_images
-        db.commit()
-        db.refresh(db_product)
+        if _is_postgres(db):
+            # Append server-side with jsonb || instead of resending the existing list
+            db_product = db.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(images=func.coalesce(Product.images, literal_column("'[]'::jsonb")).op('||', return_type=JSONB)(cast(new_images, JSONB)))
+                .returning(Product)
+            ).scalar_one()
+            response = ProductResponse.model_validate(db_product)
+            db.commit()
+        else:
+            db_product.images = current_images + new_images
+            db.commit()
+            db.refresh(db_product)
+            response = ProductResponse.model_validate(db_product)
+        _invalidate_search_caches()
         
         return {
             "message": f"Successfully added {len(new_images)} images",
-            "product": db_product
+            "product": response
         }
         
     except Exception as e:
@@ -934,7 +1044,7 @@ async def delete_product_image(
     if isinstance(user, HTTPException):
         raise user
     
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = db.get(Product, product_id, options=[load_only(Product.id, Product.images, Product.primary_image_index)])
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -950,17 +1060,39 @@ async def delete_product_image(
         
         # Delete the image files
         if 'url' in image_to_delete and image_to_delete['url'].startswith(PRODUCT_BASE_URL):
-            delete_single_image_file(image_to_delete['url'])
-        
-        # Remove from images array
-        updated_images = [img for i, img in enumerate(db_product.images) if i != image_index]
+            await delete_single_image_file(image_to_delete['url'])
         
         # If we deleted the primary image and there are other images, set the first one as primary
-        if image_to_delete.get('is_primary') and updated_images:
-            updated_images[0]['is_primary'] = True
+        values = {}
+        primary_index = db_product.primary_image_index
+        if primary_index is not None:
+            if image_index == primary_index:
+                values["primary_image_index"] = 0
+            elif image_index < primary_index:
+                values["primary_image_index"] = primary_index - 1
+        promote_first = primary_index is None and image_to_delete.get('is_primary') and len(db_product.images) > 1
         
-        db_product.images = updated_images
+        # Remove from images array
+        if _is_postgres(db):
+            # jsonb `-` drops the element server-side instead of rewriting the list from Python
+            images_expr = Product.images.op('-', return_type=JSONB)(image_index)
+            if promote_first:
+                images_expr = func.jsonb_set(images_expr, literal_column("'{0,is_primary}'::text[]"), literal_column("'true'::jsonb"))
+            values["images"] = images_expr
+        else:
+            updated_images = [img for i, img in enumerate(db_product.images) if i != image_index]
+            if promote_first:
+                updated_images[0] = {**updated_images[0], 'is_primary': True}
+            values["images"] = updated_images
+        
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
+        _invalidate_search_caches()
         
         return {"message": "Image deleted successfully"}
         
@@ -969,21 +1101,24 @@ async def delete_product_image(
         raise HTTPException(status_code=500, detail=f"Failed to delete image: {str(e)}")
 
 @router.delete("/{product_id}")
-def delete_product(product_id: int, db: db_dependency, user: user_dependency):
+def delete_product(product_id: int, db: db_dependency, user: user_dependency, background_tasks: BackgroundTasks):
     if isinstance(user, HTTPException):
         raise user
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # Only the columns needed to find the image files; skips description/JSON payloads
+    product = db.get(Product, product_id, options=[load_only(Product.id, Product.images, Product.hover_image)])
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Delete all associated image files
-    delete_old_main_image_files(product)
-    delete_old_hover_image_files(product)
+    image_paths = main_image_file_paths(product) + hover_image_file_paths(product)
     
     # Delete product from database
     db.delete(product)
     db.commit()
+    _invalidate_search_caches()
+    
+    # Delete all associated image files after the response, in one pool dispatch
+    background_tasks.add_task(bulk_unlink, image_paths)
     return {"message": "Product deleted successfully"}
 
 @router.patch("/{product_id}/images/set-primary")
@@ -999,7 +1134,7 @@ def set_primary_image(
     if isinstance(user, HTTPException):
         raise user
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id, options=[load_only(Product.id, Product.images)])
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -1009,46 +1144,26 @@ def set_primary_image(
     if image_index < 0 or image_index >= len(product.images):
         raise HTTPException(status_code=400, detail="Invalid image index")
     
-    # Create a new list to ensure SQLAlchemy detects the change
-    updated_images = []
-    for i, image in enumerate(product.images):
-        # Create a new dict for each image to ensure change detection
-        updated_image = dict(image)  # Create a copy
-        updated_image["is_primary"] = (i == image_index)
-        updated_images.append(updated_image)
-    
-    # Assign the new list to trigger change detection
-    product.images = updated_images
+    # Single scalar update; is_primary flags are derived from it when serialized
+    product = db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(primary_image_index=image_index)
+        .returning(Product)
+    ).scalar_one()
     
-    # Add debug logging
-    logger.info(f"Setting primary image for product {product_id} to index {image_index}")
-    logger.info(f"Updated images: {product.images}")
+    # Lazy %-formatting: no repr of the images list unless the record is emitted
+    logger.info("Primary image set pid=%d idx=%d n=%d", product_id, image_index, len(product.images))
     
+    response = ProductResponse.model_validate(product)
     db.commit()
-    db.refresh(product)
+    _invalidate_search_caches()
     
-    # Verify the change was persisted
-    logger.info(f"After commit - Product images: {product.images}")
-    
-    return {"message": "Primary image set successfully", "product": product}
-
-@router.get("/share/product/{product_id}", response_class=HTMLResponse)
-async def share_product(product_id: int, db: db_dependency):
-    """Generate a shareable HTML page with Open Graph and Twitter Card meta tags"""
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        return HTMLResponse("<h1>Product not found</h1>", status_code=404)
+    return {"message": "Primary image set successfully", "product": response}
 
-    # Ensure values exist
-    title = product.title or "Product"
-    description = product.description or f"Price: {product.price} RWF"
-    image = product.images[0] if product.images else "{MAINURL}/default.jpg"
-    encode = encode_id(product.id)
-    url = f"{FRONTEND_URL_ONLINE}product/{encode}"
-    print(image["url"])
-    img = "https://umukamezi.nexventures.net"  + image["url"]
-    print(img)
-    # print(img)
+@lru_cache(maxsize=4096)
+def _render_share_html(title: str, description: str, img: str, url: str) -> str:
+    """Open Graph / Twitter Card page for a product; cached on its rendered values"""
     return f"""
     <!DOCTYPE html>
     <html lang="en">
@@ -1074,4 +1189,28 @@ async def share_product(product_id: int, db: db_dependency):
         <script>window.location.href="{url}"</script>
     </body>
     </html>
-    """
\ No newline at end of file
+    """
+
+@router.get("/share/product/{product_id}", response_class=HTMLResponse)
+async def share_product(product_id: int, request: Request, db: db_dependency):
+    """Generate a shareable HTML page with Open Graph and Twitter Card meta tags"""
+    product = db.get(Product, product_id, options=[load_only(
+        Product.id, Product.title, Product.description, Product.price, Product.images, Product.updated_at
+    )])
+    if not product:
+        return HTMLResponse("<h1>Product not found</h1>", status_code=404)
+
+    # Crawlers (WhatsApp/Twitter/Facebook) revalidate with If-None-Match
+    etag = '"' + hashlib.md5(f"{product.id}-{product.updated_at}".encode()).hexdigest() + '"'
+    cache_headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    # Ensure values exist
+    title = product.title or "Product"
+    description = product.description or f"Price: {product.price} RWF"
+    image_url = product.images[0].get("url") if product.images else "/default.jpg"
+    encode = encode_id(product.id)
+    url = f"{FRONTEND_URL_ONLINE}product/{encode}"
+    img = "https://umukamezi.nexventures.net" + image_url
+    return HTMLResponse(content=_render_share_html(title, description, img, url), headers=cache_headers)
@@ -1,9 +1,24 @@
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import func, desc, and_
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, desc, case, true, literal, text, cast, Integer, table, column, or_, tuple_
+from sqlalchemy.exc import DBAPIError
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import csv
+import io
+import logging
+import os
+import threading
+import time
+
+import orjson
 
 from db.connection import db_dependency
+from db.database import engine, SessionLocal
 from models.userModels import Users, LoginLogs
 from models.Products import Product
 from models.Categories import SubCategory, ProductCategory, MainCategory
@@ -12,368 +27,869 @@ from models.billing import Billing # keep billing
 # Removed: from models.orders import Order, OrderItem
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+logger = logging.getLogger(__name__)
+
+# Materialized views behind /summary and /analytics top products; refreshed in the background
+SUMMARY_VIEW = "mv_dashboard_summary"
+TOP_PRODUCTS_VIEW = "mv_top_products"
+REPORT_VIEWS_REFRESH_SECONDS = int(os.getenv("DASHBOARD_VIEWS_REFRESH_SECONDS", "300"))
+# Advisory lock key shared by every worker's refresh loop, so one of them does the work
+REPORT_VIEWS_LOCK_KEY = 0x64617368
+
+# /analytics responses, cached per period as serialized JSON for a short time window
+ANALYTICS_CACHE_SECONDS = int(os.getenv("DASHBOARD_ANALYTICS_CACHE_SECONDS", "300"))
+ANALYTICS_PERIODS = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}
+_analytics_cache = {}  # period -> (time bucket, JSON bytes)
+
+# Comprehensive reports, cached per (start_date, end_date, include_details); small LRU with a TTL
+REPORT_CACHE_SECONDS = int(os.getenv("DASHBOARD_REPORT_CACHE_SECONDS", "60"))
+REPORT_CACHE_SIZE = 16
+REPORT_BATCH_SIZE = 1000  # rows per fetch when streaming report sections
+REPORT_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DASHBOARD_REPORT_WORKERS", "4")), thread_name_prefix="dashboard-report"
+)
+_report_cache = OrderedDict()  # key -> (expires at, report JSON bytes)
+_report_cache_lock = threading.Lock()
+
+
+def _json_response(content):
+    """
+    Response for already-serialized JSON bytes. Report payloads are encoded
+    with orjson, which is much faster than the stdlib encoder FastAPI uses;
+    datetimes are left in the payloads as-is and encoded by orjson (ISO 8601).
+    """
+    return Response(content=content, media_type="application/json")
+
+
+def _cached_report(key):
+    with _report_cache_lock:
+        entry = _report_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _report_cache[key]
+            return None
+        _report_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_report(key, report):
+    with _report_cache_lock:
+        _report_cache[key] = (time.monotonic() + REPORT_CACHE_SECONDS, report)
+        _report_cache.move_to_end(key)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+
+
+def _owner_columns():
+    """Owner columns to select alongside a row outer-joined to Users"""
+    return (Users.id.label("owner_id"), Users.fname, Users.lname, Users.email)
+
+
+def _owner_fields(row):
+    """user_name / user_email report fields from a row selected with _owner_columns()"""
+    if row.owner_id is None:
+        return {"user_name": "Unknown", "user_email": "Unknown"}
+    return {"user_name": f"{row.fname} {row.lname}", "user_email": row.email}
+
+
+def _date_bounds(start_date, end_date):
+    """
+    Half-open [start, end) datetime range covering whole days from the ISO
+    start/end date strings, so created_at can be compared directly (and use
+    its index) instead of being wrapped in date().
+    """
+    start = end = None
+    if start_date:
+        start_day = datetime.fromisoformat(start_date.replace('Z', '+00:00')).date()
+        start = datetime.combine(start_day, datetime.min.time())
+    if end_date:
+        end_day = datetime.fromisoformat(end_date.replace('Z', '+00:00')).date()
+        end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+    return start, end
+
+
+def _created_between(column, bounds):
+    start, end = bounds
+    conditions = []
+    if start:
+        conditions.append(column >= start)
+    if end:
+        conditions.append(column < end)
+    return conditions
+
+
+def _summary_counts_query(db):
+    """
+    All /summary counts as one statement: one conditional-aggregate subquery per
+    table (each table scanned once), cross-joined into a single row.
+    """
+    users = db.query(
+        func.count(Users.id).label("users_total"),
+        func.count(case((Users.is_active == True, 1))).label("users_active"),
+        func.count(case((Users.is_verified == True, 1))).label("users_verified"),
+    ).subquery()
+    products = db.query(
+        func.count(Product.id).label("products_total"),
+        func.count(case((Product.is_active == True, 1))).label("products_active"),
+        func.count(case((Product.is_featured == True, 1))).label("products_featured"),
+    ).subquery()
+    main_categories = db.query(func.count(MainCategory.id).label("main_categories")).subquery()
+    sub_categories = db.query(func.count(SubCategory.id).label("sub_categories")).subquery()
+    product_categories = db.query(func.count(ProductCategory.id).label("product_categories")).subquery()
+    carts = db.query(
+        func.count(Cart.id).label("carts_total"),
+        func.count(case((Cart.is_active == True, 1))).label("carts_active"),
+    ).subquery()
+    wishlists = db.query(
+        func.count(Wishlist.id).label("wishlists_total"),
+        func.count(case((Wishlist.is_active == True, 1))).label("wishlists_active"),
+    ).subquery()
+    billings = db.query(func.count(Billing.id).label("billings_total")).subquery()
+    logs = db.query(
+        func.count(LoginLogs.id).label("logins_total"),
+        func.count(case((LoginLogs.device_active == True, 1))).label("devices_active"),
+    ).subquery()
+
+    subqueries = [users, products, main_categories, sub_categories, product_categories,
+                  carts, wishlists, billings, logs]
+    query = db.query(*[column for subquery in subqueries for column in subquery.c]).select_from(users)
+    for subquery in subqueries[1:]:
+        # Each subquery is a single row, so joining ON true just places them side by side
+        query = query.join(subquery, true())
+    return query
+
+
+def _top_products_rollup_query(db):
+    """Cart item totals per product and day; /analytics sums the days in its period"""
+    bucket_date = func.date(CartItem.created_at)
+    return db.query(
+        CartItem.product_id,
+        bucket_date.label("bucket_date"),
+        func.sum(CartItem.quantity).label("total_quantity"),
+        func.count(CartItem.cart_id).label("cart_appearances"),
+    ).group_by(CartItem.product_id, bucket_date)
+
+
+def _report_view_queries(db):
+    """Materialized view name -> (defining query, unique key columns)"""
+    return {
+        SUMMARY_VIEW: (
+            _summary_counts_query(db).add_columns(
+                literal(1).label("id"),
+                func.now().label("generated_at"),
+            ),
+            ("id",),
+        ),
+        TOP_PRODUCTS_VIEW: (_top_products_rollup_query(db), ("product_id", "bucket_date")),
+    }
+
+
+def create_report_views():
+    """Create the dashboard materialized views (and their unique indexes) if missing"""
+    if engine.dialect.name != "postgresql":
+        return
+    with SessionLocal() as db:
+        views = {
+            name: (str(query.statement.compile(
+                dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+            )), key_columns)
+            for name, (query, key_columns) in _report_view_queries(db).items()
+        }
+    with engine.begin() as connection:
+        # Workers start together; the lock keeps them from creating the views at once
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REPORT_VIEWS_LOCK_KEY})
+        for name, (select_sql, key_columns) in views.items():
+            connection.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {select_sql}"))
+            # REFRESH ... CONCURRENTLY needs a unique index on the view
+            connection.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_{'_'.join(key_columns)} "
+                f"ON {name} ({', '.join(key_columns)})"
+            ))
+
+
+def refresh_report_views():
+    """
+    Refresh the dashboard views, unless another worker is refreshing them or
+    already did within this interval. Every worker runs the refresh loop, so
+    without this the views would be refreshed once per worker per interval.
+    Returns whether this call refreshed them.
+    """
+    with engine.begin() as connection:
+        # Released with the transaction; workers that don't get it skip rather than queue
+        if not connection.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REPORT_VIEWS_LOCK_KEY}
+        ).scalar():
+            return False
+        refreshed_recently = connection.execute(text(
+            f"SELECT now() - generated_at < make_interval(secs => :seconds) FROM {SUMMARY_VIEW}"
+        ), {"seconds": REPORT_VIEWS_REFRESH_SECONDS * 0.9}).scalar()
+        if refreshed_recently:
+            return False
+        for name in (SUMMARY_VIEW, TOP_PRODUCTS_VIEW):
+            connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+    return True
+
+
+async def refresh_report_views_periodically():
+    """Background task: keep the dashboard views at most REPORT_VIEWS_REFRESH_SECONDS stale"""
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        await asyncio.to_thread(create_report_views)
+    except Exception as e:
+        logger.error(f"Could not create dashboard views: {str(e)}")
+        return
+    while True:
+        await asyncio.sleep(REPORT_VIEWS_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(refresh_report_views)
+        except Exception as e:
+            logger.error(f"Refreshing dashboard views failed: {str(e)}")
+
+
+def _summary_counts(db):
+    """Counts row from the materialized view, or computed live if the view is unavailable"""
+    if engine.dialect.name == "postgresql":
+        try:
+            return db.execute(text(f"SELECT * FROM {SUMMARY_VIEW}")).one()
+        except DBAPIError:
+            db.rollback()
+    return _summary_counts_query(db).add_columns(func.now().label("generated_at")).one()
+
+
+def _top_products(db, start_date, limit=10):
+    """Top products by cart quantity since start_date, from the daily roll-up view when available"""
+    def top(rollup):
+        return db.query(
+            rollup.c.product_id,
+            Product.title.label('product_name'),
+            cast(func.sum(rollup.c.total_quantity), Integer).label('total_quantity'),
+            cast(func.sum(rollup.c.cart_appearances), Integer).label('cart_appearances')
+        ).join(
+            Product, Product.id == rollup.c.product_id
+        ).filter(
+            rollup.c.bucket_date >= start_date.date()
+        ).group_by(
+            rollup.c.product_id, Product.title
+        ).order_by(
+            desc('total_quantity')
+        ).limit(limit).all()
+
+    if engine.dialect.name == "postgresql":
+        try:
+            return top(table(
+                TOP_PRODUCTS_VIEW,
+                column("product_id"), column("bucket_date"),
+                column("total_quantity"), column("cart_appearances"),
+            ))
+        except DBAPIError:
+            db.rollback()
+    return top(_top_products_rollup_query(db).subquery())
 
 
 @router.get("/summary")
-async def get_dashboard_summary(db: db_dependency):
+def get_dashboard_summary(db: db_dependency):
     try:
-        # --- Users ---
-        total_users = db.query(func.count(Users.id)).scalar()
-        active_users = db.query(func.count(Users.id)).filter(Users.is_active == True).scalar()
-        verified_users = db.query(func.count(Users.id)).filter(Users.is_verified == True).scalar()
-
-        # --- Products ---
-        total_products = db.query(func.count(Product.id)).scalar()
-        active_products = db.query(func.count(Product.id)).filter(Product.is_active == True).scalar()
-        featured_products = db.query(func.count(Product.id)).filter(Product.is_featured == True).scalar()
-
-        # --- Categories ---
-        main_categories = db.query(func.count(MainCategory.id)).scalar()
-        sub_categories = db.query(func.count(SubCategory.id)).scalar()
-        product_categories = db.query(func.count(ProductCategory.id)).scalar()
-
-        # --- Carts ---
-        total_carts = db.query(func.count(Cart.id)).scalar()
-        active_carts = db.query(func.count(Cart.id)).filter(Cart.is_active == True).scalar()
-        inactive_carts = db.query(func.count(Cart.id)).filter(Cart.is_active == False).scalar()
-
-        # --- Wishlists ---
-        total_wishlists = db.query(func.count(Wishlist.id)).scalar()
-        active_wishlists = db.query(func.count(Wishlist.id)).filter(Wishlist.is_active == True).scalar()
-        inactive_wishlists = db.query(func.count(Wishlist.id)).filter(Wishlist.is_active == False).scalar()
-
-        # --- Billing ---
-        total_billings = db.query(func.count(Billing.id)).scalar()
-
-        # --- Logs ---
-        total_logins = db.query(func.count(LoginLogs.id)).scalar()
-        active_devices = db.query(func.count(LoginLogs.id)).filter(LoginLogs.device_active == True).scalar()
-
-        return {
+        counts = _summary_counts(db)
+
+        return _json_response(orjson.dumps({
+            "generated_at": counts.generated_at,
             "users": {
-                "total": total_users,
-                "active": active_users,
-                "verified": verified_users,
+                "total": counts.users_total,
+                "active": counts.users_active,
+                "verified": counts.users_verified,
             },
             "products": {
-                "total": total_products,
-                "active": active_products,
-                "featured": featured_products,
+                "total": counts.products_total,
+                "active": counts.products_active,
+                "featured": counts.products_featured,
             },
             "categories": {
-                "main": main_categories,
-                "sub": sub_categories,
-                "product": product_categories,
+                "main": counts.main_categories,
+                "sub": counts.sub_categories,
+                "product": counts.product_categories,
             },
             "carts": {
-                "total": total_carts,
-                "active": active_carts,
-                "inactive": inactive_carts,
+                "total": counts.carts_total,
+                "active": counts.carts_active,
+                "inactive": counts.carts_total - counts.carts_active,
             },
             "wishlists": {
-                "total": total_wishlists,
-                "active": active_wishlists,
-                "inactive": inactive_wishlists,
+                "total": counts.wishlists_total,
+                "active": counts.wishlists_active,
+                "inactive": counts.wishlists_total - counts.wishlists_active,
             },
-            "billings": total_billings,
+            "billings": counts.billings_total,
             "logs": {
-                "total_logins": total_logins,
-                "active_devices": active_devices,
+                "total_logins": counts.logins_total,
+                "active_devices": counts.devices_active,
             },
-        }
+        }))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# --- Comprehensive report sections; each runs on its own session (see _run_section) ---
+
+def _page(query, created_at, id_column, cursor, page_size):
+    """
+    Newest-first keyset page ordered by (created_at, id), rows with no
+    created_at last: at most page_size rows after cursor, the (created_at, id)
+    of the previous page's last row (created_at None once the dated rows are
+    used up).
+    """
+    if cursor is not None:
+        cursor_created_at, cursor_id = cursor
+        if cursor_created_at is None:
+            query = query.filter(created_at.is_(None), id_column < cursor_id)
+        else:
+            query = query.filter(or_(
+                tuple_(created_at, id_column) < tuple_(cursor_created_at, cursor_id),
+                created_at.is_(None)
+            ))
+    return query.order_by(created_at.desc().nullslast(), id_column.desc()).limit(page_size)
+
+
+# Sections paged by the comprehensive report; each keeps its own position
+PAGED_SECTIONS = ("users", "products", "carts", "wishlists", "billings")
+
+
+def _parse_cursor(cursor):
+    """
+    Decode a next_cursor into {section: (created_at, id) to continue after, or
+    None once the section is exhausted}. Sections not in it start from the top.
+    """
+    if cursor is None:
+        return {}
+    try:
+        raw = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        positions = {}
+        for name, position in raw.items():
+            if name not in PAGED_SECTIONS:
+                raise ValueError(name)
+            if position is not None:
+                created_at, row_id = position
+                position = (datetime.fromisoformat(created_at) if created_at else None, int(row_id))
+            positions[name] = position
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return positions
+
+
+def _next_cursor(sections, page_size):
+    """
+    Cursor for the page after this one: every section continues after its own
+    last row, so a dense table doesn't hold the others back. A section that
+    came back short is exhausted. Returns None once all of them are.
+    """
+    positions = {}
+    for name in PAGED_SECTIONS:
+        rows = sections[name]
+        if len(rows) < page_size:
+            positions[name] = None
+        else:
+            created_at = rows[-1]["created_at"]
+            positions[name] = [created_at.isoformat() if created_at else None, rows[-1]["id"]]
+    if not any(positions.values()):
+        return None
+    return base64.urlsafe_b64encode(orjson.dumps(positions)).decode()
+
+
+def _section_totals(db, date_bounds):
+    """Row counts behind the paged sections (same date filters), as one statement"""
+    return db.query(
+        db.query(func.count(Users.id)).filter(
+            *_created_between(Users.created_at, date_bounds)
+        ).scalar_subquery().label("users"),
+        db.query(func.count(Product.id)).scalar_subquery().label("products"),
+        db.query(func.count(Cart.id)).filter(
+            *_created_between(Cart.created_at, date_bounds)
+        ).scalar_subquery().label("carts"),
+        db.query(func.count(Wishlist.id)).scalar_subquery().label("wishlists"),
+        db.query(func.count(Billing.id)).scalar_subquery().label("billings"),
+    ).one()
+
+
+def _users_section(db, date_bounds, cursor, page_size):
+    # Only the columns the report shows (skips password hashes, provider ids, ...)
+    users_query = db.query(
+        Users.id, Users.email, Users.fname, Users.lname, Users.phone,
+        Users.is_active, Users.is_verified, Users.created_at
+    ).filter(*_created_between(Users.created_at, date_bounds))
+
+    users_data = _page(users_query, Users.created_at, Users.id, cursor, page_size).all()
+
+    user_ids = [user.id for user in users_data]
+
+    # Per-user counts for just this page of users, one indexed GROUP BY each
+    cart_counts = {}
+    wishlist_counts = {}
+    billing_counts = {}
+    if user_ids:
+        cart_counts = dict(db.query(Cart.user_id, func.count(Cart.id)).filter(
+            Cart.user_id.in_(user_ids)
+        ).group_by(Cart.user_id).all())
+        wishlist_counts = dict(db.query(Wishlist.user_id, func.count(Wishlist.id)).filter(
+            Wishlist.user_id.in_(user_ids)
+        ).group_by(Wishlist.user_id).all())
+        billing_counts = dict(db.query(Billing.user_id, func.count(Billing.id)).filter(
+            Billing.user_id.in_(user_ids)
+        ).group_by(Billing.user_id).all())
+
+    users_report = []
+    for user in users_data:
+        user_carts = cart_counts.get(user.id, 0)
+        user_wishlists = wishlist_counts.get(user.id, 0)
+        user_billings = billing_counts.get(user.id, 0)
+
+        users_report.append({
+            "id": user.id,
+            "email": user.email,
+            "first_name": user.fname,
+            "last_name": user.lname,
+            "phone": user.phone,
+            "is_active": user.is_active,
+            "is_verified": user.is_verified,
+            "created_at": user.created_at,
+            "cart_count": user_carts,
+            "wishlist_count": user_wishlists,
+            "billing_count": user_billings
+        })
+    return users_report
+
+
+def _products_section(db, cursor, page_size):
+    products_data = _page(db.query(
+        Product.id, Product.title, Product.price, Product.instock, Product.is_active,
+        Product.is_featured, Product.category_id, Product.created_at, Product.updated_at
+    ), Product.created_at, Product.id, cursor, page_size).all()
+    product_ids = [product.id for product in products_data]
+
+    # Cart appearances for just this page of products
+    cart_appearances = {}
+    if product_ids:
+        cart_appearances = dict(db.query(CartItem.product_id, func.count(CartItem.id)).filter(
+            CartItem.product_id.in_(product_ids)
+        ).group_by(CartItem.product_id).all())
+    products_report = []
+    for product in products_data:
+        cart_items_count = cart_appearances.get(product.id, 0)
+
+        products_report.append({
+            "id": product.id,
+            "name": product.title,
+            "price": float(product.price) if product.price else 0,
+            "stock_quantity": product.instock,
+            "is_active": product.is_active,
+            "is_featured": product.is_featured,
+            "category_id": product.category_id,
+            "created_at": product.created_at,
+            "updated_at": product.updated_at,
+            "cart_appearances": cart_items_count
+        })
+    return products_report
+
+
+def _carts_section(db, date_bounds, include_details, cursor, page_size):
+    # Scalar columns only (no ORM objects), owners joined in
+    carts_rows = _page(db.query(
+        Cart.id, Cart.user_id, Cart.is_active, Cart.created_at, Cart.updated_at,
+        *_owner_columns()
+    ).outerjoin(
+        Users, Users.id == Cart.user_id
+    ).filter(*_created_between(Cart.created_at, date_bounds)), Cart.created_at, Cart.id, cursor, page_size).all()
+    cart_ids = [cart.id for cart in carts_rows]
+
+    # Totals (and, for the detailed view, item rows) for just this page of carts
+    cart_totals = {}
+    items_by_cart = defaultdict(list)
+    if cart_ids:
+        cart_totals_rows = db.query(
+            CartItem.cart_id,
+            func.sum(CartItem.quantity),
+            func.sum(CartItem.price_at_time * CartItem.quantity),
+            func.count(CartItem.id)
+        ).filter(CartItem.cart_id.in_(cart_ids)).group_by(CartItem.cart_id).all()
+        cart_totals = {row[0]: row[1:] for row in cart_totals_rows}
+
+        if include_details:
+            cart_items_rows = db.query(
+                CartItem.cart_id, CartItem.product_id, Product.title,
+                CartItem.quantity, CartItem.price_at_time
+            ).outerjoin(
+                Product, Product.id == CartItem.product_id
+            ).filter(CartItem.cart_id.in_(cart_ids)).yield_per(REPORT_BATCH_SIZE)
+            for item in cart_items_rows:
+                items_by_cart[item.cart_id].append({
+                    "product_id": item.product_id,
+                    "product_name": item.title,
+                    "quantity": item.quantity,
+                    "price_at_time": float(item.price_at_time) if item.price_at_time else 0,
+                    "total_item_price": float(item.price_at_time or 0) * (item.quantity or 0)
+                })
+
+    carts_report = []
+    for cart in carts_rows:
+        total_items, total_value, items_count = cart_totals.get(cart.id, (0, 0, 0))
+        carts_report.append({
+            "id": cart.id,
+            "user_id": cart.user_id,
+            **_owner_fields(cart),
+            "is_active": cart.is_active,
+            "total_items": int(total_items or 0),
+            "total_value": float(total_value or 0),
+            "created_at": cart.created_at,
+            "updated_at": cart.updated_at,
+            "items_count": items_count,
+            "items": items_by_cart[cart.id] if include_details else []
+        })
+    return carts_report
+
+
+def _wishlists_section(db, cursor, page_size):
+    wishlists_rows = _page(db.query(
+        Wishlist.id, Wishlist.user_id, Wishlist.is_active, Wishlist.created_at,
+        *_owner_columns()
+    ).outerjoin(
+        Users, Users.id == Wishlist.user_id
+    ), Wishlist.created_at, Wishlist.id, cursor, page_size).yield_per(REPORT_BATCH_SIZE)
+    wishlists_report = [
+        {
+            "id": wishlist.id,
+            "user_id": wishlist.user_id,
+            **_owner_fields(wishlist),
+            "is_active": wishlist.is_active,
+            "created_at": wishlist.created_at
+        } for wishlist in wishlists_rows
+    ]
+    return wishlists_report
+
+
+def _billings_section(db, cursor, page_size):
+    billings_rows = _page(db.query(
+        Billing.id, Billing.user_id, Billing.card_number, Billing.billing_type, Billing.created_at,
+        *_owner_columns()
+    ).outerjoin(
+        Users, Users.id == Billing.user_id
+    ), Billing.created_at, Billing.id, cursor, page_size).yield_per(REPORT_BATCH_SIZE)
+    billings_report = [
+        {
+            "id": billing.id,
+            "user_id": billing.user_id,
+            **_owner_fields(billing),
+            "account_number": billing.card_number,
+            "payment_method": billing.billing_type,
+            "created_at": billing.created_at,
+        } for billing in billings_rows
+    ]
+    return billings_report
+
+
+def _categories_section(db):
+    main_categories_data = db.query(
+        MainCategory.id, MainCategory.name, MainCategory.description, MainCategory.created_at,
+        func.count(SubCategory.id).label("sub_categories_count")
+    ).outerjoin(
+        SubCategory, SubCategory.main_category_id == MainCategory.id
+    ).group_by(MainCategory.id).all()
+    main_categories_report = []
+    for category in main_categories_data:
+        main_categories_report.append({
+            "id": category.id,
+            "name": category.name,
+            "description": category.description,
+            "sub_categories_count": category.sub_categories_count,
+            "created_at": category.created_at
+        })
+
+    sub_categories_data = db.query(
+        SubCategory.id, SubCategory.name, SubCategory.description, SubCategory.main_category_id,
+        SubCategory.created_at, func.count(ProductCategory.id).label("product_categories_count")
+    ).outerjoin(
+        ProductCategory, ProductCategory.sub_category_id == SubCategory.id
+    ).group_by(SubCategory.id).all()
+    sub_categories_report = []
+    for category in sub_categories_data:
+        sub_categories_report.append({
+            "id": category.id,
+            "name": category.name,
+            "description": category.description,
+            "main_category_id": category.main_category_id,
+            "product_categories_count": category.product_categories_count,
+            "created_at": category.created_at
+        })
+
+    product_categories_data = db.query(
+        ProductCategory.id, ProductCategory.name, ProductCategory.description, ProductCategory.sub_category_id,
+        ProductCategory.created_at, func.count(Product.id).label("products_count")
+    ).outerjoin(
+        Product, Product.category_id == ProductCategory.id
+    ).group_by(ProductCategory.id).all()
+    product_categories_report = []
+    for category in product_categories_data:
+        product_categories_report.append({
+            "id": category.id,
+            "name": category.name,
+            "description": category.description,
+            "sub_category_id": category.sub_category_id,
+            "products_count": category.products_count,
+            "created_at": category.created_at
+        })
+    return {
+        "main_categories": main_categories_report,
+        "sub_categories": sub_categories_report,
+        "product_categories": product_categories_report
+    }
+
+
+def _login_logs_section(db):
+    login_logs_data = db.query(
+        LoginLogs.id, LoginLogs.user_id, LoginLogs.ip_address, LoginLogs.device_info,
+        LoginLogs.login_time, LoginLogs.device_active, *_owner_columns()
+    ).outerjoin(
+        Users, Users.id == LoginLogs.user_id
+    ).order_by(desc(LoginLogs.login_time)).limit(100).all()
+    login_logs_report = []
+    for log in login_logs_data:
+        login_logs_report.append({
+            "id": log.id,
+            "user_id": log.user_id,
+            **_owner_fields(log),
+            "ip_address": log.ip_address,
+            "device_info": log.device_info,
+            "login_time": log.login_time,
+            "device_active": log.device_active
+        })
+    return login_logs_report
+
+
+def _run_section(section, *args):
+    """Run one report section on a session of its own; sessions must not be shared across threads"""
+    with SessionLocal() as db:
+        return section(db, *args)
+
+
 @router.get("/comprehensive-report")
-async def get_comprehensive_report(
-    db: db_dependency,
+def get_comprehensive_report(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    include_details: bool = True
+    include_details: bool = True,
+    page_size: int = Query(500, ge=1, le=5000, description="Rows per section on this page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
     Generate a comprehensive report with detailed information across all entities
-    (without orders)
+    (without orders). Users, products, carts, wishlists and billings are paged
+    newest first, each section at its own position; pass summary.next_cursor
+    back as cursor for the next page. Sections that have run out come back empty.
     """
+    positions = _parse_cursor(cursor)
+
+    # Dashboard tiles poll this with the same parameters; reuse a recent report
+    cache_key = (start_date, end_date, include_details, page_size, cursor)
+    cached = _cached_report(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
     try:
         # Date filtering
-        date_filter = []
-        if start_date:
-            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            date_filter.append(func.date(Users.created_at) >= start_dt.date())
-        if end_date:
-            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            date_filter.append(func.date(Users.created_at) <= end_dt.date())
-
-        date_condition = and_(*date_filter) if date_filter else True
-
-        # --- USERS DETAILED REPORT ---
-        users_query = db.query(Users)
-        if date_filter:
-            users_query = users_query.filter(date_condition)
-        
-        users_data = users_query.order_by(desc(Users.created_at)).all()
-        
-        users_report = []
-        for user in users_data:
-            user_carts = db.query(func.count(Cart.id)).filter(Cart.user_id == user.id).scalar() or 0
-            user_wishlists = db.query(func.count(Wishlist.id)).filter(Wishlist.user_id == user.id).scalar() or 0
-            user_billings = db.query(func.count(Billing.id)).filter(Billing.user_id == user.id).scalar() or 0
-            
-            users_report.append({
-                "id": user.id,
-                "email": user.email,
-                "first_name": user.fname,
-                "last_name": user.lname,
-                "phone": user.phone,
-                "is_active": user.is_active,
-                "is_verified": user.is_verified,
-                "created_at": user.created_at.isoformat() if user.created_at else None,
-                "cart_count": user_carts,
-                "wishlist_count": user_wishlists,
-                "billing_count": user_billings
-            })
-
-        # --- PRODUCTS DETAILED REPORT ---
-        products_data = db.query(Product).order_by(desc(Product.created_at)).all()
-        products_report = []
-        for product in products_data:
-            cart_items_count = db.query(func.count(CartItem.id)).filter(
-                CartItem.product_id == product.id
-            ).scalar() or 0
-            
-            products_report.append({
-                "id": product.id,
-                "name": product.title,
-                "price": float(product.price) if product.price else 0,
-                "stock_quantity": product.instock,
-                "is_active": product.is_active,
-                "is_featured": product.is_featured,
-                "category_id": product.category_id,
-                "created_at": product.created_at.isoformat() if product.created_at else None,
-                "updated_at": product.updated_at.isoformat() if product.updated_at else None,
-                "cart_appearances": cart_items_count
-            })
-
-        # --- CARTS DETAILED REPORT ---
-        carts_query = db.query(Cart)
-        if date_filter:
-            carts_query = carts_query.filter(date_condition)
-            
-        carts_data = carts_query.order_by(desc(Cart.created_at)).all()
-        carts_report = []
-        for cart in carts_data:
-            cart_items = db.query(CartItem).filter(CartItem.cart_id == cart.id).all()
-            total_items = sum(item.quantity for item in cart_items)
-            total_value = sum(float(item.price_at_time or 0) * item.quantity for item in cart_items)
-            
-            user = db.query(Users).filter(Users.id == cart.user_id).first()
-            
-            carts_report.append({
-                "id": cart.id,
-                "user_id": cart.user_id,
-                "user_name": f"{user.fname} {user.lname}" if user else "Unknown",
-                "user_email": user.email if user else "Unknown",
-                "is_active": cart.is_active,
-                "total_items": total_items,
-                "total_value": total_value,
-                "created_at": cart.created_at.isoformat() if cart.created_at else None,
-                "updated_at": cart.updated_at.isoformat() if cart.updated_at else None,
-                "items_count": len(cart_items),
-                "items": [
-                    {
-                        "product_id": item.product_id,
-                        "product_name": item.product_name,
-                        "quantity": item.quantity,
-                        "price_at_time": float(item.price_at_time) if item.price_at_time else 0,
-                        "total_item_price": float(item.total_item_price) if item.total_item_price else 0
-                    } for item in cart_items
-                ] if include_details else []
-            })
-
-        # --- WISHLISTS DETAILED REPORT ---
-        wishlists_data = db.query(Wishlist).order_by(desc(Wishlist.created_at)).all()
-        wishlists_report = []
-        for wishlist in wishlists_data:
-            user = db.query(Users).filter(Users.id == wishlist.user_id).first()
-            
-            wishlists_report.append({
-                "id": wishlist.id,
-                "user_id": wishlist.user_id,
-                "user_name": f"{user.fname} {user.lname}" if user else "Unknown",
-                "user_email": user.email if user else "Unknown",
-                "is_active": wishlist.is_active,
-                "created_at": wishlist.created_at.isoformat() if wishlist.created_at else None
-            })
-
-        # --- BILLINGS DETAILED REPORT ---
-        billings_data = db.query(Billing).order_by(desc(Billing.created_at)).all()
-        billings_report = []
-        for billing in billings_data:
-
-            user = db.query(Users).filter(Users.id == billing.user_id).first()
-            
-            billings_report.append({
-                "id": billing.id,
-                "user_id": billing.user_id,
-                "user_name": f"{user.fname} {user.lname}" if user else "Unknown",
-                "user_email": user.email if user else "Unknown",
-                "account_number": billing.card_number,
-                "payment_method": billing.billing_type,
-                "created_at": billing.created_at.isoformat() if billing.created_at else None,
-            })
-
-        # --- CATEGORIES REPORT ---
-        main_categories_data = db.query(MainCategory).all()
-        main_categories_report = []
-        for category in main_categories_data:
-            sub_categories_count = db.query(func.count(SubCategory.id)).filter(
-                SubCategory.main_category_id == category.id
-            ).scalar() or 0
-            
-            main_categories_report.append({
-                "id": category.id,
-                "name": category.name,
-                "description": category.description,
-                "sub_categories_count": sub_categories_count,
-                "created_at": category.created_at.isoformat() if category.created_at else None
-            })
-
-        sub_categories_data = db.query(SubCategory).all()
-        sub_categories_report = []
-        for category in sub_categories_data:
-            product_categories_count = db.query(func.count(ProductCategory.id)).filter(
-                ProductCategory.sub_category_id == category.id
-            ).scalar() or 0
-            
-            sub_categories_report.append({
-                "id": category.id,
-                "name": category.name,
-                "description": category.description,
-                "main_category_id": category.main_category_id,
-                "product_categories_count": product_categories_count,
-                "created_at": category.created_at.isoformat() if category.created_at else None
-            })
-
-        product_categories_data = db.query(ProductCategory).all()
-        product_categories_report = []
-        for category in product_categories_data:
-            products_count = db.query(func.count(Product.id)).filter(
-                Product.category_id == category.id
-            ).scalar() or 0
-            
-            product_categories_report.append({
-                "id": category.id,
-                "name": category.name,
-                "description": category.description,
-                "sub_category_id": category.sub_category_id,
-                "products_count": products_count,
-                "created_at": category.created_at.isoformat() if category.created_at else None
-            })
-
-        # --- LOGIN LOGS REPORT ---
-        login_logs_data = db.query(LoginLogs).order_by(desc(LoginLogs.login_time)).limit(100).all()
-        login_logs_report = []
-        for log in login_logs_data:
-            user = db.query(Users).filter(Users.id == log.user_id).first()
-            
-            login_logs_report.append({
-                "id": log.id,
-                "user_id": log.user_id,
-                "user_name": f"{user.fname} {user.lname}" if user else "Unknown",
-                "user_email": user.email if user else "Unknown",
-                "ip_address": log.ip_address,
-                "device_info": log.device_info,
-                "login_time": log.login_time.isoformat() if log.login_time else None,
-                "device_active": log.device_active
-            })
+        date_bounds = _date_bounds(start_date, end_date)
+
+        # The sections are independent, so they run concurrently on REPORT_POOL
+        # and the report takes about as long as its slowest section
+        paged_sections = {
+            "users": (_users_section, date_bounds),
+            "products": (_products_section,),
+            "carts": (_carts_section, date_bounds, include_details),
+            "wishlists": (_wishlists_section,),
+            "billings": (_billings_section,),
+        }
+        futures = {
+            "categories": REPORT_POOL.submit(_run_section, _categories_section),
+            "login_logs": REPORT_POOL.submit(_run_section, _login_logs_section),
+            "totals": REPORT_POOL.submit(_run_section, _section_totals, date_bounds),
+        }
+        for name, (section, *args) in paged_sections.items():
+            if name in positions and positions[name] is None:
+                continue  # exhausted on an earlier page
+            futures[name] = REPORT_POOL.submit(
+                _run_section, section, *args, positions.get(name), page_size
+            )
+        sections = {name: future.result() for name, future in futures.items()}
+        for name in PAGED_SECTIONS:
+            sections.setdefault(name, [])
+        next_cursor = _next_cursor(sections, page_size)
+        totals = sections["totals"]
+        users_report = sections["users"]
+        products_report = sections["products"]
+        carts_report = sections["carts"]
+        wishlists_report = sections["wishlists"]
+        billings_report = sections["billings"]
+        main_categories_report = sections["categories"]["main_categories"]
+        sub_categories_report = sections["categories"]["sub_categories"]
+        product_categories_report = sections["categories"]["product_categories"]
+        login_logs_report = sections["login_logs"]
 
         summary_stats = {
-            "total_users": len(users_report),
-            "total_products": len(products_report),
-            "total_carts": len(carts_report),
-            "total_wishlists": len(wishlists_report),
-            "total_billings": len(billings_report),
+            "total_users": totals.users,
+            "total_products": totals.products,
+            "total_carts": totals.carts,
+            "total_wishlists": totals.wishlists,
+            "total_billings": totals.billings,
             "total_main_categories": len(main_categories_report),
             "total_sub_categories": len(sub_categories_report),
             "total_product_categories": len(product_categories_report),
             "total_login_records": len(login_logs_report),
-            "report_generated_at": datetime.now().isoformat(),
+            "report_generated_at": datetime.now(),
+            "page_size": page_size,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
             "date_range": {
                 "start_date": start_date,
                 "end_date": end_date
             }
         }
 
-        return {
+        report = {
             "summary": summary_stats,
             "users": users_report,
             "products": products_report,
             "carts": carts_report,
             "wishlists": wishlists_report,
             "billings": billings_report,
-            "categories": {
-                "main_categories": main_categories_report,
-                "sub_categories": sub_categories_report,
-                "product_categories": product_categories_report
-            },
+            "categories": sections["categories"],
             "login_logs": login_logs_report
         }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating comprehensive report: {str(e)}")
 
+    content = orjson.dumps(report)
+    _cache_report(cache_key, content)
+    return _json_response(content)
+
+
+def _iter_report_csv(date_bounds=(None, None), batch_size=REPORT_BATCH_SIZE):
+    """
+    Yield the report as CSV text, one section (header row + data rows) after
+    another. Rows come from server-side cursors in batches of batch_size, so
+    memory stays bounded regardless of table sizes.
+    """
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def emit(row):
+        writer.writerow(row)
+        value = line.getvalue()
+        line.seek(0)
+        line.truncate(0)
+        return value
+
+    def in_range(query, column):
+        return query.filter(*_created_between(column, date_bounds))
+
+    # Runs after the endpoint has returned, so it holds its own session
+    with SessionLocal() as db:
+        yield emit(["users"])
+        yield emit(["id", "email", "first_name", "last_name", "phone", "is_active", "is_verified", "created_at"])
+        users = in_range(db.query(
+            Users.id, Users.email, Users.fname, Users.lname, Users.phone,
+            Users.is_active, Users.is_verified, Users.created_at
+        ), Users.created_at).order_by(desc(Users.created_at))
+        for row in users.yield_per(batch_size):
+            yield emit(row)
+
+        yield emit([])
+        yield emit(["products"])
+        yield emit(["id", "name", "price", "stock_quantity", "is_active", "is_featured", "category_id", "created_at"])
+        products = db.query(
+            Product.id, Product.title, Product.price, Product.instock,
+            Product.is_active, Product.is_featured, Product.category_id, Product.created_at
+        ).order_by(desc(Product.created_at))
+        for row in products.yield_per(batch_size):
+            yield emit(row)
+
+        yield emit([])
+        yield emit(["carts"])
+        yield emit(["id", "user_id", "is_active", "total_items", "total_value", "items_count", "created_at"])
+        carts = in_range(db.query(
+            Cart.id, Cart.user_id, Cart.is_active,
+            func.coalesce(func.sum(CartItem.quantity), 0),
+            func.coalesce(func.sum(CartItem.price_at_time * CartItem.quantity), 0),
+            func.count(CartItem.id),
+            Cart.created_at
+        ).outerjoin(CartItem, CartItem.cart_id == Cart.id), Cart.created_at).group_by(Cart.id).order_by(desc(Cart.created_at))
+        for row in carts.yield_per(batch_size):
+            yield emit(row)
+
+        yield emit([])
+        yield emit(["wishlists"])
+        yield emit(["id", "user_id", "is_active", "created_at"])
+        wishlists = db.query(
+            Wishlist.id, Wishlist.user_id, Wishlist.is_active, Wishlist.created_at
+        ).order_by(desc(Wishlist.created_at))
+        for row in wishlists.yield_per(batch_size):
+            yield emit(row)
+
+        yield emit([])
+        yield emit(["billings"])
+        yield emit(["id", "user_id", "account_number", "payment_method", "created_at"])
+        billings = db.query(
+            Billing.id, Billing.user_id, Billing.card_number, Billing.billing_type, Billing.created_at
+        ).order_by(desc(Billing.created_at))
+        for row in billings.yield_per(batch_size):
+            yield emit(row)
+
 
 @router.get("/export-report")
-async def export_comprehensive_report(
-    db: db_dependency,
+def export_comprehensive_report(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    format: str = "json"  # Could be extended to support CSV, PDF, etc.
+    format: str = "json",  # Could be extended to support CSV, PDF, etc.
+    page_size: int = Query(500, ge=1, le=5000, description="Rows per section on this page (json)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (json)")
 ):
     """
     Export comprehensive report in different formats (without orders)
     """
     try:
-        report_data = await get_comprehensive_report(db, start_date, end_date, include_details=True)
-        
-        if format == "json":
-            return report_data
-        elif format == "csv":
-            # Placeholder for CSV export
-            return {
-                "message": "CSV export feature coming soon",
-                "data": report_data
-            }
-        else:
-            return report_data
+        if format == "csv":
+            # Streamed row by row; the JSON report is never assembled for CSV
+            return StreamingResponse(
+                _iter_report_csv(_date_bounds(start_date, end_date)),
+                media_type="text/csv",
+                headers={"Content-Disposition": 'attachment; filename="comprehensive-report.csv"'}
+            )
+
+        report_data = get_comprehensive_report(
+            start_date, end_date, include_details=True, page_size=page_size, cursor=cursor
+        )
+        return report_data
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting report: {str(e)}")
 
 
 @router.get("/analytics")
-async def get_analytics_report(
+def get_analytics_report(
     db: db_dependency,
     period: str = "30d"  # 7d, 30d, 90d, 1y
 ):
     """
     Get analytics data for charts and trends (without orders)
     """
+    # Polling dashboards hit the same few periods; serve them from the cache
+    # until the current time bucket rolls over
+    bucket = int(time.time() // ANALYTICS_CACHE_SECONDS)
+    cached = _analytics_cache.get(period)
+    if cached and cached[0] == bucket:
+        return _json_response(cached[1])
+
     try:
         end_date = datetime.now()
-        if period == "7d":
-            start_date = end_date - timedelta(days=7)
-        elif period == "30d":
-            start_date = end_date - timedelta(days=30)
-        elif period == "90d":
-            start_date = end_date - timedelta(days=90)
-        elif period == "1y":
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=30)
+        start_date = end_date - timedelta(days=ANALYTICS_PERIODS.get(period, 30))
 
         # User registration trends
         user_registrations = db.query(
@@ -395,33 +911,23 @@ async def get_analytics_report(
             func.date(Billing.created_at)
         ).order_by('date').all()
 
-        # Top products by cart appearances
-        top_products = db.query(
-            CartItem.product_id,
-            CartItem.quantity,
-            func.sum(CartItem.quantity).label('total_quantity'),
-            func.count(CartItem.cart_id).label('cart_appearances')
-        ).group_by(
-            CartItem.product_id, CartItem.quantity
-        ).order_by(
-            desc('total_quantity')
-        ).limit(10).all()
+        # Top products by cart appearances within the period
+        top_products = _top_products(db, start_date)
 
-        return {
+        analytics = {
             "period": period,
             "date_range": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
+                "start_date": start_date,
+                "end_date": end_date
             },
             "user_registration_trends": [
-                {"date": reg.date.isoformat() if reg.date else None, "count": reg.count}
+                {"date": reg.date, "count": reg.count}
                 for reg in user_registrations
             ],
             "billing_trends": [
                 {
-                    "date": trend.date.isoformat() if trend.date else None,
-                    "billing_count": trend.count,
-                    "daily_revenue": float(trend.revenue) if trend.revenue else 0
+                    "date": trend.date,
+                    "billing_count": trend.count
                 }
                 for trend in billing_trends
             ],
@@ -438,3 +944,8 @@ async def get_analytics_report(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating analytics: {str(e)}")
+
+    content = orjson.dumps(analytics)
+    if period in ANALYTICS_PERIODS:
+        _analytics_cache[period] = (bucket, content)
+    return _json_response(content)
@@ -1,16 +1,209 @@
 # [file name]: search.py
 # [file content begin]
 from fastapi import APIRouter
-from sqlalchemy import or_, func
+from fastapi.responses import Response
+from sqlalchemy import or_, and_, func, case, text, cast
+from sqlalchemy.dialects.postgresql import array, JSONB
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import joinedload
 from db.connection import db_dependency
-from models.Products import Product
+from db.database import engine
+from models.Products import Product, TITLE_TSVECTOR_CONFIG
 from typing import List
+from collections import OrderedDict
+import heapq
+import orjson
+import os
+import threading
 import time
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Search responses, cached per (query, limit, skip); popular queries repeat a
+# lot, so a small LRU with a TTL absorbs most of the traffic. Product writes
+# clear it (see invalidate_search_cache)
+SEARCH_CACHE_SECONDS = int(os.getenv("SEARCH_CACHE_SECONDS", "60"))
+SEARCH_CACHE_SIZE = 2048
+_search_cache = OrderedDict()  # key -> (expires at, response)
+_search_cache_lock = threading.Lock()
+
+
+def _cached_search(key):
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_search(key, response):
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic() + SEARCH_CACHE_SECONDS, response)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+def invalidate_search_cache():
+    """Drop cached search responses; called after product writes"""
+    with _search_cache_lock:
+        _search_cache.clear()
+
+
+def _json_response(payload):
+    """
+    Encode a search/diagnostics response with orjson rather than FastAPI's
+    jsonable_encoder plus the stdlib encoder; datetimes are encoded by orjson
+    (ISO 8601)
+    """
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+# Trigram indexes behind the leading-wildcard LIKE matches below; a b-tree
+# cannot serve '%term%' so without these every term is a sequential scan.
+# Search only ever looks at active products, so inactive rows are left out
+SEARCH_INDEXES = {
+    "ix_products_title_active_trgm": "lower(title)",
+    "ix_products_description_active_trgm": "lower(description)",
+}
+# Full-table versions of the above, replaced by the partial indexes
+SUPERSEDED_SEARCH_INDEXES = ("ix_products_title_trgm", "ix_products_description_trgm")
+
+def create_search_indexes():
+    """
+    Create the pg_trgm extension and the search trigram indexes if missing;
+    built CONCURRENTLY (outside a transaction) so product writes aren't
+    blocked, and idempotent so several workers can run it
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for name, expression in SEARCH_INDEXES.items():
+                connection.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                    f"ON products USING gin ({expression} gin_trgm_ops) WHERE is_active"
+                ))
+            for name in SUPERSEDED_SEARCH_INDEXES:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    except DBAPIError as e:
+        # Search still works without them, just with sequential scans
+        logger.warning(f"Could not create search trigram indexes: {e}")
+
+
+# match_tier value -> match type, best tier first
+MATCH_TIERS = {
+    4: "exact_phrase",
+    3: "all_words",
+    2: "some_words",
+    1: "broad_search",
+}
+
+
+# Each term adds title/description/tags/features predicates to the search
+# query, so very long queries are cut down to their most selective terms
+MAX_SEARCH_TERMS = 8
+
+
+def _normalize_query(query: str):
+    """
+    (original_query, search_lower, query_words) for a raw query string:
+    the query as typed minus outer whitespace, its lowercase form with runs
+    of whitespace collapsed (so "iphone  pro" and "iphone pro" share one
+    phrase match and one cache entry), and its words. An empty or blank
+    query gives ("", "", [])
+    """
+    original_query = (query or "").strip()
+    query_words = original_query.lower().split()
+    return original_query, " ".join(query_words), query_words
+
+
+def _search_terms(query_words: List[str]) -> List[str]:
+    """
+    Distinct query words worth matching on (very short ones skipped); beyond
+    MAX_SEARCH_TERMS only the longest (most selective) are kept, in query order
+    """
+    terms = list(dict.fromkeys(word for word in query_words if len(word) > 1))
+    if len(terms) > MAX_SEARCH_TERMS:
+        longest = set(heapq.nlargest(MAX_SEARCH_TERMS, terms, key=len))
+        terms = [term for term in terms if term in longest]
+    return terms
+
+
+def _search_expressions(search_lower: str, query_words: List[str]):
+    """
+    SQL expressions for one search query:
+    - candidates: rows matched by any strategy
+    - match_tier: the best strategy a row satisfies (see MATCH_TIERS)
+    - score: relevance within a tier (phrase/prefix/per-word title hits,
+      whole-word full-text match and rank of the title, rating); substring
+      hits like "rust" in "frustrate" rank below whole-word ones
+    """
+    terms = _search_terms(query_words)
+    title = func.lower(Product.title)
+    description = func.lower(Product.description)
+
+    # Whole-word matches via the GIN-indexed title_tsv; substring LIKE covers
+    # matches inside words ("phone" in "iPhone") that full-text can't see
+    title_query = func.plainto_tsquery(TITLE_TSVECTOR_CONFIG, search_lower)
+    fulltext_hit = Product.title_tsv.op("@@")(title_query)
+
+    # Terms go in as escaped LIKE operands ('%' and '_' typed by the user
+    # match literally); both sides are lowercase, so LIKE does what ILIKE did
+    phrase_hit = title.contains(search_lower, autoescape=True)
+    title_hits = [title.contains(term, autoescape=True) for term in terms]
+    description_hits = [description.contains(term, autoescape=True) for term in terms]
+    field_hits = [Product.tags.contains([term]) for term in terms] + \
+                 [Product.features.contains([term]) for term in terms]
+
+    # A single-word query's only term is the phrase itself: its title LIKE is
+    # phrase_hit, so it is not repeated in the OR/CASE arms and its per-word
+    # bonus is added to the phrase score instead
+    phrase_term_bonus = 0
+    if terms == [search_lower]:
+        title_hits = []
+        phrase_term_bonus = 30
+
+    tiers = [(phrase_hit, 4)]
+    if len(query_words) > 1 and title_hits:
+        tiers.append((and_(*title_hits), 3))
+    if terms:
+        tiers.append((or_(*title_hits, *description_hits), 2))
+    match_tier = case(*tiers, else_=1)
+
+    # A title can only start with the phrase if it contains it, so the prefix
+    # LIKE is evaluated for phrase hits only
+    prefix_hit = title.startswith(search_lower, autoescape=True)
+    phrase_score = 200 + phrase_term_bonus
+    score = case((phrase_hit, case((prefix_hit, phrase_score + 30), else_=phrase_score)), else_=0) \
+        + sum(case((hit, 30), else_=0) for hit in title_hits) \
+        + case((fulltext_hit, 100), else_=0) \
+        + func.ts_rank_cd(Product.title_tsv, title_query) * 100 \
+        + func.coalesce(Product.rating, 0) * 5
+
+    candidates = or_(phrase_hit, fulltext_hit, *title_hits, *description_hits, *field_hits)
+    return candidates, match_tier, score
+
+
+def _matched_words_expression(query_words: List[str]):
+    """
+    Array of the query words found (as plain substrings) in the lowercased
+    title, in query order; computed by the database alongside the row
+    """
+    title = func.lower(func.coalesce(Product.title, ""))
+    return func.array_remove(
+        array([case((func.strpos(title, word) > 0, word)) for word in query_words]),
+        None
+    )
+
+
 def _calculate_match_score(match_type: str, matched_words_count: int, total_query_words: int) -> int:
     """
     Calculate a relevance score based on match type and how many words matched.
@@ -32,18 +225,76 @@ def _calculate_match_score(match_type: str, matched_words_count: int, total_quer
     
     return min(score, 100)  # Cap at 100
 
+
+def _category_payload(category):
+    return {
+        'id': category.id,
+        'name': category.name,
+        'slug': category.slug,
+        'image': category.image
+    }
+
+
+def _product_payload(product: Product, category_payloads: dict) -> dict:
+    """
+    Response dict for one product in search results; category_payloads maps
+    category id -> payload and is shared across the rows of one response
+    """
+    category = product.category
+    if category is not None:
+        category_payload = category_payloads.get(category.id)
+        if category_payload is None:
+            category_payload = category_payloads[category.id] = _category_payload(category)
+    else:
+        category_payload = None
+    
+    return {
+        'id': product.id,
+        'title': product.title,
+        'description': product.description,
+        'price': product.price,
+        'original_price': product.original_price,
+        'discount': product.discount,
+        'rating': product.rating,
+        'is_new': product.is_new,
+        'is_featured': product.is_featured,
+        'is_active': product.is_active,
+        'reviews_count': product.reviews_count,
+        'instock': product.instock,
+        'delivery_fee': product.delivery_fee,
+        'brock': product.brock,
+        'returnDay': product.returnDay,
+        'warranty': product.warranty,
+        'hover_image': product.hover_image,
+        'owner_id': product.owner_id,
+        'tutorial_video': product.tutorial_video,
+        'tags': product.tags or [],
+        'features': product.features or [],
+        'colors': product.colors or [],
+        'created_at': product.created_at,
+        'updated_at': product.updated_at,
+        'category_id': product.category_id,
+        'images': product.resolved_images(),
+        'category': category_payload
+    }
+
+
 @router.get("/search")
 def search_products_endpoint(query: str, limit: int = 50, skip: int = 0, db: db_dependency = None):
     """
     Smart product search that prioritizes exact phrase matching.
-    1. First try exact phrase (all words together)
-    2. If no results, try all individual words (AND condition)
-    3. If still no results, try some words (OR condition)
+    Results are ranked in tiers:
+    1. Exact phrase (all words together) in the title
+    2. All individual words in the title (AND condition)
+    3. Some words in the title or description (OR condition)
+    4. Broad matches (tags / features)
     """
     start_time = time.time()
     
     try:
-        if not query or query.strip() == "":
+        # Clean the query - keep it exactly as user typed but lowercase for search
+        original_query, search_lower, query_words = _normalize_query(query)
+        if not original_query:
             return {
                 "query": query,
                 "search_type": "empty_query",
@@ -53,168 +304,106 @@ def search_products_endpoint(query: str, limit: int = 50, skip: int = 0, db: db_
                 "processing_time_ms": 0
             }
 
-        # Clean the query - keep it exactly as user typed but lowercase for search
-        original_query = query.strip()
-        search_lower = original_query.lower()
-        query_words = search_lower.split()
-        
         logger.info(f"Searching for: '{original_query}' (lowercase: '{search_lower}', words: {query_words})")
         
-        all_products = []
-        total_count = 0
-        search_type = "no_matches"
+        cache_key = (search_lower, limit, skip)
+        cached = _cached_search(cache_key)
+        if cached is not None:
+            return _json_response({
+                **cached,
+                "query": original_query,
+                "corrected_query": original_query,
+                "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+            })
         
-        # STEP 1: EXACT PHRASE MATCH (highest priority)
-        logger.info(f"STEP 1: Trying EXACT phrase match: '{search_lower}'")
-        exact_phrase_products = db.query(Product).filter(
+        # One scored query instead of up to four sequential strategy queries:
+        # match_tier records which strategy a row satisfies and orders the
+        # tiers as before, score ranks rows within a tier
+        candidates, match_tier, score = _search_expressions(search_lower, query_words)
+        
+        # Every candidate's tier and score, kept narrow (no product payload)
+        scored = db.query(
+            Product.id.label("id"),
+            match_tier.label("match_tier"),
+            score.label("score"),
+            Product.created_at.label("created_at")
+        ).filter(
             Product.is_active == True,
-            func.lower(Product.title).ilike(f"%{search_lower}%")
-        ).order_by(Product.created_at.desc()).all()
-        
-        if exact_phrase_products:
-            logger.info(f"Found {len(exact_phrase_products)} products with EXACT phrase match")
-            all_products = exact_phrase_products
-            total_count = len(exact_phrase_products)
-            search_type = "exact_phrase"
-        
-        # STEP 2: If no exact phrase matches, try ALL WORDS in title (AND condition)
-        elif len(query_words) > 1:
-            logger.info(f"STEP 2: No exact matches. Trying ALL words in title: {query_words}")
-            
-            # Build AND conditions for all words
-            and_conditions = []
-            for word in query_words:
-                if len(word) > 1:  # Skip very short words
-                    and_conditions.append(func.lower(Product.title).ilike(f"%{word}%"))
-            
-            if and_conditions:
-                # Find products that contain ALL search words
-                all_words_products = db.query(Product).filter(
-                    Product.is_active == True,
-                    *and_conditions  # This creates an AND condition
-                ).order_by(Product.created_at.desc()).all()
-                
-                if all_words_products:
-                    logger.info(f"Found {len(all_words_products)} products with ALL words")
-                    all_products = all_words_products
-                    total_count = len(all_words_products)
-                    search_type = "all_words"
-        
-        # STEP 3: If still no matches, try SOME WORDS (OR condition)
-        if not all_products and query_words:
-            logger.info(f"STEP 3: No matches with all words. Trying SOME words: {query_words}")
-            
-            # Build OR conditions for individual words
-            or_conditions = []
-            for word in query_words:
-                if len(word) > 1:  # Skip very short words
-                    # Search in title
-                    or_conditions.append(func.lower(Product.title).ilike(f"%{word}%"))
-                    # Also search in description
-                    or_conditions.append(func.lower(Product.description).ilike(f"%{word}%"))
-            
-            if or_conditions:
-                some_words_products = db.query(Product).filter(
-                    Product.is_active == True,
-                    or_(*or_conditions)
-                ).order_by(Product.created_at.desc()).all()
-                
-                if some_words_products:
-                    logger.info(f"Found {len(some_words_products)} products with SOME words")
-                    all_products = some_words_products
-                    total_count = len(some_words_products)
-                    search_type = "some_words"
-        
-        # STEP 4: If still no matches, try broader search across all fields
-        if not all_products and query_words:
-            logger.info(f"STEP 4: No title matches. Trying broader search across all fields")
-            
-            # Search across all relevant fields
-            broad_conditions = []
-            for word in query_words:
-                if len(word) > 1:
-                    # Search in multiple fields
-                    broad_conditions.append(func.lower(Product.title).ilike(f"%{word}%"))
-                    broad_conditions.append(func.lower(Product.description).ilike(f"%{word}%"))
-                    # Search in JSON arrays
-                    broad_conditions.append(Product.tags.contains([word]))
-                    broad_conditions.append(Product.features.contains([word]))
-            
-            if broad_conditions:
-                broad_products = db.query(Product).filter(
-                    Product.is_active == True,
-                    or_(*broad_conditions)
-                ).order_by(Product.created_at.desc()).all()
-                
-                if broad_products:
-                    logger.info(f"Found {len(broad_products)} products with broader search")
-                    all_products = broad_products
-                    total_count = len(broad_products)
-                    search_type = "broad_search"
+            candidates
+        ).subquery()
+        
+        # The requested page of ranked ids; each row also carries the per-tier
+        # totals of the whole candidate set (window aggregates are computed
+        # before OFFSET/LIMIT), so counting needs no second scan
+        tier_totals = [f"tier_{tier}" for tier in MATCH_TIERS]
+        page = db.query(
+            scored,
+            *[
+                func.count().filter(scored.c.match_tier == tier).over().label(label)
+                for tier, label in zip(MATCH_TIERS, tier_totals)
+            ]
+        ).order_by(
+            scored.c.match_tier.desc(), scored.c.score.desc(),
+            scored.c.created_at.desc(), scored.c.id.desc()
+        ).offset(skip).limit(limit).subquery()
+        
+        # Full rows for the page only, in ranked order, with the query words
+        # each title contains and the category joined in (many-to-one)
+        paginated_rows = db.query(
+            Product,
+            page.c.match_tier,
+            _matched_words_expression(query_words).label("matched_words"),
+            *[page.c[label] for label in tier_totals]
+        ).join(
+            page, Product.id == page.c.id
+        ).options(
+            joinedload(Product.category)
+        ).order_by(
+            page.c.match_tier.desc(), page.c.score.desc(),
+            page.c.created_at.desc(), page.c.id.desc()
+        ).all()
+        
+        if paginated_rows:
+            first_row = paginated_rows[0]
+            tier_counts = {tier: getattr(first_row, label) for tier, label in zip(MATCH_TIERS, tier_totals)}
+        elif skip:
+            # Paged past the end: the totals still have to be counted
+            tier_counts = dict(db.query(match_tier, func.count()).filter(
+                Product.is_active == True,
+                candidates
+            ).group_by(match_tier).all())
+        else:
+            tier_counts = {}
+        tier_counts = {tier: count for tier, count in tier_counts.items() if count}
+        
+        total_count = sum(tier_counts.values())
+        match_statistics = {
+            MATCH_TIERS[tier]: tier_counts[tier]
+            for tier in sorted(tier_counts, reverse=True)
+        }
+        search_type = MATCH_TIERS[max(tier_counts)] if tier_counts else "no_matches"
         
         processing_time = (time.time() - start_time) * 1000
         
-        # Apply pagination
-        paginated_products = all_products[skip:skip + limit]
+        logger.info(f"Final: Found {total_count} total products ({match_statistics}), showing {len(paginated_rows)}")
         
-        logger.info(f"Final: Found {total_count} total products ({search_type}), showing {len(paginated_products)}")
+        # No queries past this point (category is already loaded), so hand the
+        # connection back to the pool before building the response
+        db.close()
         
-        # Convert products to response format
+        # Convert products to response format; rows on a page mostly share a
+        # few categories, so each category payload is built once
+        category_payloads = {}
         response_products = []
-        for product in paginated_products:
-            # Calculate which words matched in the title
-            matched_words = []
-            if product.title:
-                title_lower = product.title.lower()
-                for word in query_words:
-                    if word in title_lower:
-                        matched_words.append(word)
-            
-            product_dict = {
-                'id': product.id,
-                'title': product.title,
-                'description': product.description,
-                'price': product.price,
-                'original_price': product.original_price,
-                'discount': product.discount,
-                'rating': product.rating,
-                'is_new': product.is_new,
-                'is_featured': product.is_featured,
-                'is_active': product.is_active,
-                'reviews_count': product.reviews_count,
-                'instock': product.instock,
-                'delivery_fee': product.delivery_fee,
-                'brock': product.brock,
-                'returnDay': product.returnDay,
-                'warranty': product.warranty,
-                'hover_image': product.hover_image,
-                'owner_id': product.owner_id,
-                'tutorial_video': product.tutorial_video,
-                'tags': product.tags if product.tags else [],
-                'features': product.features if product.features else [],
-                'colors': product.colors if product.colors else [],
-                'created_at': product.created_at,
-                'updated_at': product.updated_at,
-                'category_id': product.category_id,
-                'images': product.images if product.images else [],
-                'category': None,
-                'search_metadata': {
-                    'match_type': search_type,
-                    'score': _calculate_match_score(search_type, len(matched_words), len(query_words)),
-                    'matched_words': matched_words,
-                    'total_query_words': len(query_words)
-                }
+        for product, tier, matched_words, *_ in paginated_rows:
+            match_type = MATCH_TIERS[tier]
+            product_dict = _product_payload(product, category_payloads)
+            product_dict['search_metadata'] = {
+                'match_type': match_type,
+                'score': _calculate_match_score(match_type, len(matched_words), len(query_words)),
+                'matched_words': matched_words,
+                'total_query_words': len(query_words)
             }
-            
-            # Add category info if available
-            if hasattr(product, 'category') and product.category:
-                product_dict['category'] = {
-                    'id': product.category.id,
-                    'name': product.category.name,
-                    'slug': product.category.slug,
-                    'image': product.category.image if hasattr(product.category, 'image') else None
-                }
-            
             response_products.append(product_dict)
         
         # Prepare response
@@ -223,16 +412,17 @@ def search_products_endpoint(query: str, limit: int = 50, skip: int = 0, db: db_
             "corrected_query": original_query,
             "search_terms": query_words,
             "search_type": search_type,
-            "match_statistics": {search_type: total_count},
+            "match_statistics": match_statistics or {search_type: 0},
             "products": response_products,
             "suggestions": [],
             "total_results": total_count,
-            "showing_results": len(paginated_products),
+            "showing_results": len(paginated_rows),
             "processing_time_ms": round(processing_time, 2),
             "note": f"Results from {search_type} strategy"
         }
         
-        return response
+        _cache_search(cache_key, response)
+        return _json_response(response)
         
     except Exception as e:
         logger.error(f"Search endpoint error: {e}", exc_info=True)
@@ -254,48 +444,55 @@ def test_exact_search_endpoint(query: str, db: db_dependency = None):
     Test endpoint to see exact phrase matching.
     """
     try:
-        if not query or query.strip() == "":
+        original_query, search_lower, query_words = _normalize_query(query)
+        if not original_query:
             return {"error": "No query provided"}
         
-        original_query = query.strip()
-        search_lower = original_query.lower()
-        
-        # Test exact phrase match
-        exact_matches = db.query(Product).filter(
+        title_lower = func.lower(Product.title)
+        
+        # Test exact phrase match; only the sample rows shown are fetched, and
+        # the match count (reported up to 20) comes along as a window total.
+        # Every phrase hit contains every query word, so there is no
+        # per-word ordering to apply among the samples
+        exact_matches = db.query(
+            Product.id,
+            Product.title,
+            (func.jsonb_array_length(func.coalesce(Product.images, cast("[]", JSONB))) > 0).label("has_images"),
+            func.count().over().label("total")
+        ).filter(
             Product.is_active == True,
-            func.lower(Product.title).ilike(f"%{search_lower}%")
-        ).limit(20).all()
-        
-        # Test individual words
-        query_words = search_lower.split()
+            title_lower.contains(search_lower, autoescape=True)
+        ).order_by(
+            Product.created_at.desc(), Product.id.desc()
+        ).limit(5).all()
+        exact_match_count = min(exact_matches[0].total, 20) if exact_matches else 0
+        counted_words = list(dict.fromkeys(word for word in query_words if len(word) > 1))
         word_matches = {}
         
-        for word in query_words:
-            if len(word) > 1:
-                matches = db.query(Product).filter(
-                    Product.is_active == True,
-                    func.lower(Product.title).ilike(f"%{word}%")
-                ).count()
-                word_matches[word] = matches
+        # One filtered count per word, all in a single round trip; the WHERE
+        # limits the scan to titles with some word, via the trigram index
+        if counted_words:
+            word_hits = [title_lower.contains(word, autoescape=True) for word in counted_words]
+            counts = db.query(*[
+                func.count().filter(hit) for hit in word_hits
+            ]).filter(Product.is_active == True, or_(*word_hits)).one()
+            word_matches = dict(zip(counted_words, counts))
         
         # Get sample products that match
-        sample_products = []
-        for product in exact_matches[:5]:
-            sample_products.append({
-                "id": product.id,
-                "title": product.title,
-                "has_images": len(product.images) > 0 if product.images else False
-            })
+        sample_products = [
+            {"id": row.id, "title": row.title, "has_images": row.has_images}
+            for row in exact_matches
+        ]
         
-        return {
+        return _json_response({
             "query": original_query,
             "search_query_lower": search_lower,
             "query_words": query_words,
-            "exact_phrase_matches": len(exact_matches),
+            "exact_phrase_matches": exact_match_count,
             "individual_word_matches": word_matches,
             "sample_products": sample_products,
             "note": f"Searching for exact phrase: '{search_lower}'"
-        }
+        })
         
     except Exception as e:
         return {
@@ -310,13 +507,10 @@ def analyze_search_query(query: str, db: db_dependency = None):
     Analyze what happens with a search query.
     """
     try:
-        if not query or query.strip() == "":
+        original_query, search_lower, query_words = _normalize_query(query)
+        if not original_query:
             return {"error": "No query provided"}
         
-        original_query = query.strip()
-        search_lower = original_query.lower()
-        query_words = search_lower.split()
-        
         analysis = {
             "original_query": original_query,
             "lowercase_query": search_lower,
@@ -325,55 +519,46 @@ def analyze_search_query(query: str, db: db_dependency = None):
             "strategies": []
         }
         
-        # Strategy 1: Exact phrase
-        exact_count = db.query(Product).filter(
-            Product.is_active == True,
-            func.lower(Product.title).ilike(f"%{search_lower}%")
-        ).count()
+        # Per-word title conditions, shared by the AND / OR strategies
+        title_lower = func.lower(Product.title)
+        word_conditions = [
+            title_lower.contains(word, autoescape=True) for word in query_words if len(word) > 1
+        ]
+        
+        # Every strategy's count in one round trip, as FILTERed aggregates; the
+        # WHERE (any strategy matches) lets the trigram index pick the rows
+        # instead of aggregating over every active product
+        phrase_hit = title_lower.contains(search_lower, autoescape=True)
+        strategy_counts = [func.count().filter(phrase_hit)]
+        if word_conditions:
+            strategy_counts.append(func.count().filter(and_(*word_conditions)))
+            strategy_counts.append(func.count().filter(or_(*word_conditions)))
+        counts = db.query(*strategy_counts).filter(
+            Product.is_active == True, or_(phrase_hit, *word_conditions)
+        ).one()
         
+        # Strategy 1: Exact phrase
         analysis["strategies"].append({
             "strategy": "exact_phrase",
             "query": search_lower,
-            "matches": exact_count
+            "matches": counts[0]
         })
         
-        # Strategy 2: All words (AND)
-        if len(query_words) > 1:
-            and_conditions = []
-            for word in query_words:
-                if len(word) > 1:
-                    and_conditions.append(func.lower(Product.title).ilike(f"%{word}%"))
-            
-            if and_conditions:
-                all_words_count = db.query(Product).filter(
-                    Product.is_active == True,
-                    *and_conditions
-                ).count()
-                
+        if word_conditions:
+            # Strategy 2: All words (AND)
+            if len(query_words) > 1:
                 analysis["strategies"].append({
                     "strategy": "all_words",
                     "words": query_words,
-                    "matches": all_words_count
+                    "matches": counts[1]
                 })
-        
-        # Strategy 3: Some words (OR)
-        if query_words:
-            or_conditions = []
-            for word in query_words:
-                if len(word) > 1:
-                    or_conditions.append(func.lower(Product.title).ilike(f"%{word}%"))
             
-            if or_conditions:
-                some_words_count = db.query(Product).filter(
-                    Product.is_active == True,
-                    or_(*or_conditions)
-                ).count()
-                
-                analysis["strategies"].append({
-                    "strategy": "some_words",
-                    "words": query_words,
-                    "matches": some_words_count
-                })
+            # Strategy 3: Some words (OR)
+            analysis["strategies"].append({
+                "strategy": "some_words",
+                "words": query_words,
+                "matches": counts[2]
+            })
         
         # Get sample titles for context
         sample_titles = db.query(Product.title).filter(
@@ -382,7 +567,7 @@ def analyze_search_query(query: str, db: db_dependency = None):
         
         analysis["sample_titles_in_db"] = [title[0] for title in sample_titles if title[0]]
         
-        return analysis
+        return _json_response(analysis)
         
     except Exception as e:
         return {
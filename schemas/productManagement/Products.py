@@ -1,5 +1,5 @@
 # schemas/product.py
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
@@ -75,6 +75,15 @@ class ProductResponse(ProductBase):
     created_at: datetime
     updated_at: datetime
     category: Optional[CategoryInfo] = None
+    primary_image_index: Optional[int] = None
+
+    @model_validator(mode="after")
+    def apply_primary_image_index(self):
+        # is_primary is derived from primary_image_index; legacy rows keep their stored flags
+        if self.primary_image_index is not None:
+            for i, image in enumerate(self.images):
+                image.is_primary = i == self.primary_image_index
+        return self
     
     class Config:
         from_attributes = True
@@ -168,7 +168,7 @@ def get_title_match_products(db, query_terms: List[str], limit: int = 100) -> Li
     phrase_query = " ".join(query_terms)
     phrase_matches = db.query(Product).filter(
         Product.is_active == True,
-        func.lower(Product.title).ilike(f"%{phrase_query.lower()}%")
+        func.lower(Product.title).contains(phrase_query.lower(), autoescape=True)
     ).limit(limit // 2).all()
     
     for product in phrase_matches:
@@ -187,7 +187,7 @@ def get_title_match_products(db, query_terms: List[str], limit: int = 100) -> Li
         conditions = []
         for term in query_terms_lower:
             if len(term) > 1:
-                conditions.append(func.lower(Product.title).ilike(f"%{term}%"))
+                conditions.append(func.lower(Product.title).contains(term, autoescape=True))
         
         if conditions:
             # Find products that match ALL terms
@@ -212,7 +212,7 @@ def get_title_match_products(db, query_terms: List[str], limit: int = 100) -> Li
         or_conditions = []
         for term in query_terms_lower:
             if len(term) > 1:
-                or_conditions.append(func.lower(Product.title).ilike(f"%{term}%"))
+                or_conditions.append(func.lower(Product.title).contains(term, autoescape=True))
         
         if or_conditions:
             some_matches = db.query(Product).filter(
@@ -296,7 +296,7 @@ def get_other_field_products(db, query_terms: List[str],
         term_conditions = []
         
         # Description matches
-        term_conditions.append(func.lower(Product.description).ilike(f"%{term.lower()}%"))
+        term_conditions.append(func.lower(Product.description).contains(term.lower(), autoescape=True))
         
         # Tags matches
         term_conditions.append(Product.tags.contains([term]))
@@ -397,14 +397,14 @@ def filter_related_products(db, top_product, limit=10):
     if hasattr(top_product, 'tags') and top_product.tags:
         for tag in top_product.tags[:5]:
             if isinstance(tag, str) and len(tag) > 2:
-                conditions.append(cast(Product.tags, Text).ilike(f"%{tag}%"))
+                conditions.append(cast(Product.tags, Text).icontains(tag, autoescape=True))
     
     # 3. Title similarity (shared words)
     if hasattr(top_product, 'title') and top_product.title:
         title_words = top_product.title.split()
         for word in title_words[:3]:
             if len(word) > 3:
-                conditions.append(func.lower(Product.title).ilike(f"%{word.lower()}%"))
+                conditions.append(func.lower(Product.title).contains(word.lower(), autoescape=True))
     
     # If no specific conditions, return empty
     if not conditions: